@@ -1 +1,5 @@
+import os
 
+if os.environ.get('PYPOKER_METRICS') or os.environ.get('PYPOKER_PROFILE'):
+    from pypoker import metrics
+    metrics.configure(os.environ)
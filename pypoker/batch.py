@@ -0,0 +1,141 @@
+"""
+Vectorized dealing and hand evaluation with NumPy.
+
+Hands are rows of an integer array of card indices (see cards.card_index):
+0 to 12 are the spades from deuce to ace, 13 to 25 the diamonds, 26 to 38
+the clubs and 39 to 51 the hearts. Rows are scored by walking the state
+table of pypoker.statetable one column at a time, so the whole batch is
+evaluated without creating a Python object per hand. deal() generates
+whole batches of deals in the same layout, ready to be evaluated.
+
+NumPy is an optional dependency, only needed by this module.
+"""
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from pypoker.cards import card_index
+from pypoker.lookup import CATEGORIES, default_table as lookup_table
+from pypoker.statetable import MAX_CARDS, default_table as state_table
+
+
+def _numpy():
+    if np is None:
+        raise ImportError('pypoker.batch requires numpy')
+    return np
+
+
+_tables = None
+
+
+def _load_tables():
+    global _tables
+    if _tables is None:
+        np = _numpy()
+        table = state_table()
+        _tables = (np.frombuffer(table.table, dtype=np.intc),
+                   np.frombuffer(table.flushes, dtype=np.intc),
+                   np.arange(52) % 13,
+                   np.array(lookup_table().bounds),
+                   np.array(CATEGORIES))
+    return _tables
+
+
+def as_array(hands):
+    """
+    :return: (N, k) array of card indices from N hands of Cards or packed ints
+    """
+    np = _numpy()
+    return np.array([[card_index(card) for card in hand] for hand in hands],
+                    dtype=np.intp)
+
+
+def evaluate(cards):
+    """
+    Scores every row of an (N, 5), (N, 6) or (N, 7) array of card indices.
+    Rows must not contain the same card twice.
+
+    :return: (strengths, categories), two arrays of length N with the
+             pypoker.lookup strength (1 to 7462) and category (800 to 0)
+             of the best 5-card hand of each row
+    """
+    np = _numpy()
+    states, flushes, ranks, bounds, categories = _load_tables()
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= MAX_CARDS:
+        raise ValueError('Expected an (N, 5) to (N, {}) array, got {}'.format(
+            MAX_CARDS, cards.shape))
+    if not np.issubdtype(cards.dtype, np.integer):
+        raise TypeError('Card indices must be integers.')
+    if cards.size and (cards.min() < 0 or cards.max() > 51):
+        raise ValueError('Card indices must be between 0 and 51.')
+
+    state = np.zeros(len(cards), dtype=np.intp)
+    for column in ranks[cards].T:
+        state = states[state + column]
+    strengths = states[state + 13]
+
+    # Bit n of mask is card index n, so each suit is a 13-bit rank bitmask
+    # and the flush table scores it (0 when fewer than 5 cards are suited).
+    mask = np.left_shift(np.int64(1), cards).sum(axis=1)
+    for suit in range(4):
+        np.maximum(strengths, flushes[(mask >> (13 * suit)) & 0x1FFF],
+                   out=strengths)
+    return strengths, categories[np.searchsorted(bounds, strengths,
+                                                 side='right') - 1]
+
+
+def deal(m, seats, cards_per_player=2, cards_per_table=5, rng=None,
+         cards=None):
+    """
+    Deals m hands at once. Each row is the prefix of a random permutation of
+    the deck, drawn with a partial Fisher-Yates shuffle run on all the rows
+    at the same time: the hole cards of seat 0, seat 1, ... then the board.
+
+    :param rng: numpy Generator, or a seed for numpy.random.default_rng
+    :param cards: card indices of the deck, all 52 cards when None
+    :return: (m, seats * cards_per_player + cards_per_table) uint8 array of
+             card indices
+    """
+    np = _numpy()
+    cards = np.arange(52, dtype=np.uint8) if cards is None else \
+        np.asarray(cards, dtype=np.uint8)
+    size = seats * cards_per_player + cards_per_table
+    if size > len(cards):
+        raise ValueError('Not enough cards for {} seats.'.format(seats))
+    rng = np.random.default_rng(rng)
+    deck = np.tile(cards, (m, 1))
+    rows = np.arange(m)
+    swaps = rng.integers(np.arange(size), len(cards), size=(m, size))
+    for i in range(size):
+        j = swaps[:, i]
+        card = deck[:, i].copy()
+        deck[:, i] = deck[rows, j]
+        deck[rows, j] = card
+    return np.ascontiguousarray(deck[:, :size])
+
+
+def seat_hands(deals, seats, cards_per_player=2, cards_per_table=5):
+    """
+    :return: (m, seats, cards_per_player + cards_per_table) array with the
+             hole cards plus the board of every seat of every deal
+    """
+    np = _numpy()
+    deals = np.asarray(deals)
+    hole_cards = deals[:, :seats * cards_per_player].reshape(
+        len(deals), seats, cards_per_player)
+    board = deals[:, seats * cards_per_player:][:, None, :]
+    return np.concatenate([hole_cards, np.broadcast_to(
+        board, (len(deals), seats, cards_per_table))], axis=2)
+
+
+def showdown(deals, seats, cards_per_player=2, cards_per_table=5):
+    """
+    :return: (m, seats) array with the strength of every seat of every deal
+    """
+    hands = seat_hands(deals, seats, cards_per_player, cards_per_table)
+    strengths, categories = evaluate(hands.reshape(-1, hands.shape[2]))
+    return strengths.reshape(len(hands), seats)
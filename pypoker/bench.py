@@ -0,0 +1,246 @@
+"""
+Benchmark suite with JSON baselines.
+
+    python -m pypoker.bench                        # print ops/sec
+    python -m pypoker.bench --save baseline.json   # record a baseline
+    python -m pypoker.bench --compare baseline.json --threshold 0.1
+    python -m pypoker.bench --memory               # bytes per live table
+
+--compare exits with status 1 when a benchmark is slower than its baseline
+by more than the threshold (a fraction of the baseline ops/sec).
+"""
+
+
+from collections import namedtuple
+import argparse
+import gc
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from pypoker.cards import CardsDeck, Card
+from pypoker.evaluator import Hand, Evaluator
+from pypoker.poker import PokerTable, PokerPlayer
+
+
+Regression = namedtuple('Regression', ['name', 'baseline', 'current',
+                                       'change'])
+
+BENCHMARKS = {}
+
+# One 7-card hand per category, as rank + suit initial strings.
+CATEGORY_HANDS = {
+    'straight_flush': 'Ts Js Qs Ks As 2d 3c',
+    'four_of_kind': '9s 9d 9c 9h 2s 5d Kc',
+    'full_house': 'Qs Qd Qc 4h 4s 7d 8c',
+    'flush': '2h 6h 9h Jh Kh 3s 4d',
+    'straight': '5s 6d 7c 8h 9s Kd 2c',
+    'three_of_kind': '7s 7d 7c 2h Js 4d Kc',
+    'two_pair': 'As Ad 8c 8h 3s Jd 6c',
+    'pair': 'Ts Td 2c 5h 8s Jd Ac',
+    'high_card': '2s 5d 7c 9h Js Qd Kc',
+}
+
+
+def cards(text):
+    suits = {suit[0]: suit for suit in CardsDeck.suits}
+    return [Card(card[0], suits[card[1]]) for card in text.split()]
+
+
+def benchmark(name):
+    """
+    Registers a function returning the callable to time as benchmark name.
+    """
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+@benchmark('hand.construction')
+def _hand_construction():
+    hand = cards(CATEGORY_HANDS['two_pair'])
+
+    def construct():
+        # Ranks and suits are computed lazily; time them with the Hand.
+        new = Hand(hand)
+        return new.ranks, new.suits
+    return construct
+
+
+def _hand_value(hand, engine):
+    hand = Hand(cards(hand))
+    return lambda: Evaluator(hand, engine).hand_value()
+
+
+def _best_hand(players, engine):
+    deck = CardsDeck()
+    hands = [Hand(deck[2 * n:2 * n + 2] + deck[-5:]) for n in range(players)]
+    return lambda: Evaluator.best_hand(hands, engine)
+
+
+@benchmark('deck.shuffle')
+def _deck_shuffle():
+    deck = CardsDeck()
+    return deck.shuffle
+
+
+@benchmark('deck.deal')
+def _deck_deal():
+    deck = CardsDeck()
+
+    def deal():
+        deck.reset()
+        for _ in range(19):
+            deck.deal()
+    return deal
+
+
+def _table_hand(players, engine):
+    table = PokerTable()
+    for n in range(players):
+        table.sit_player(PokerPlayer(str(n)))
+    table.start_game()
+
+    def play():
+        for player in table.players:
+            player.return_cards()
+        table.return_cards()
+        table.deal_cards()
+        table.showdown(engine)
+    return play
+
+
+def _register():
+    for engine in Evaluator.engines:
+        for category, hand in CATEGORY_HANDS.items():
+            benchmark('hand_value.{}.{}'.format(engine, category))(
+                lambda hand=hand, engine=engine: _hand_value(hand, engine))
+        for players in range(2, 11):
+            benchmark('best_hand.{}.{}_players'.format(engine, players))(
+                lambda players=players, engine=engine: _best_hand(players,
+                                                                  engine))
+        benchmark('table.hand.{}.6_players'.format(engine))(
+            lambda engine=engine: _table_hand(6, engine))
+
+
+_register()
+
+
+def _dealt_table(players):
+    table = PokerTable()
+    for n in range(players):
+        table.sit_player(PokerPlayer(str(n)))
+    table.start_game()
+    table.deal_cards()
+    return table
+
+
+def table_memory(tables=1000, players=6):
+    """
+    Keeps tables dealt tables of players alive at once.
+
+    :return: bytes allocated per table, measured with tracemalloc
+    """
+    _dealt_table(players)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        live = [_dealt_table(players) for _ in range(tables)]
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del live
+    return size / tables
+
+
+def run(names=None, min_time=0.2, repeat=3):
+    """
+    Times every benchmark in names (all of them when None).
+
+    :return: {name: operations per second}, best of repeat runs
+    """
+    results = {}
+    for name in sorted(BENCHMARKS) if names is None else names:
+        timer = timeit.Timer(BENCHMARKS[name]())
+        number, elapsed = timer.autorange()
+        while elapsed < min_time:
+            number *= 2
+            elapsed = timer.timeit(number)
+        best = min([elapsed] + timer.repeat(repeat - 1, number))
+        results[name] = number / best
+    return results
+
+
+def save(results, path):
+    with open(path, 'w') as file:
+        json.dump({'python': platform.python_version(),
+                   'machine': platform.machine(),
+                   'results': results}, file, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def compare(baseline, results, threshold=0.1):
+    """
+    :return: a Regression for every benchmark slower than its baseline by
+             more than threshold, sorted from the worst
+    """
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        change = current / baseline[name] - 1
+        if change < -threshold:
+            regressions.append(Regression(name, baseline[name], current,
+                                          change))
+    return sorted(regressions, key=lambda regression: regression.change)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pypoker.bench')
+    parser.add_argument('--filter', default='',
+                        help='only run benchmarks containing this string')
+    parser.add_argument('--save', help='write the results to a JSON file')
+    parser.add_argument('--compare', help='JSON baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown, as a fraction of baseline')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per timing run')
+    parser.add_argument('--memory', action='store_true',
+                        help='report bytes per live table instead')
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        for players in (2, 6, 10):
+            print('{:<45} {:>14,.0f} bytes/table'.format(
+                'memory.table.{}_players'.format(players),
+                table_memory(players=players)))
+        return 0
+
+    names = [name for name in sorted(BENCHMARKS) if args.filter in name]
+    results = run(names, args.min_time)
+    baseline = load(args.compare) if args.compare else {}
+    for name in names:
+        line = '{:<45} {:>14,.0f} ops/s'.format(name, results[name])
+        if name in baseline:
+            line += ' {:+7.1%}'.format(results[name] / baseline[name] - 1)
+        print(line)
+    if args.save:
+        save(results, args.save)
+
+    regressions = compare(baseline, results, args.threshold)
+    for regression in regressions:
+        print('REGRESSION {}: {:,.0f} -> {:,.0f} ops/s ({:+.1%})'.format(
+            *regression))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
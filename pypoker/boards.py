@@ -0,0 +1,137 @@
+"""
+Strength of every hole-card combo on a complete board.
+
+BoardScores scores the 1,081 combos (see ranges.COMBOS) not holding a
+board card once, walking the board a single time, and keeps their
+strengths by combo index and as a sorted array. Showdowns, range and
+hand-rank queries on that board are then lookups and bisections in those
+arrays.
+
+BoardCache keeps the BoardScores of the boards in use, under the card mask
+of the board (see cards.card_mask), and evicts the least recently used
+ones past its size.
+"""
+
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from pypoker.cards import card_index, card_mask, pack_cards
+from pypoker.evaluator import CacheInfo, Evaluator
+from pypoker.equity import BOARD_SIZE
+from pypoker.ranges import COMBOS, combo_index, combo_strengths
+from pypoker.statetable import default_table
+
+
+class BoardScores:
+
+    """ Strengths of every combo on one 5-card board. """
+
+    __slots__ = ('board', 'mask', 'strengths', 'sorted')
+
+    def __init__(self, board, table=None):
+        """
+        :param board: 5 Cards, packed cards or card indices
+        :param table: StateTable scoring the hands, the default one if None
+        """
+        board = pack_cards(board)
+        if len(board) != BOARD_SIZE:
+            raise ValueError('The board must have {} cards.'.format(
+                BOARD_SIZE))
+        self.board = board
+        self.mask = card_mask(board)
+        live = [combo for combo, (first, second) in enumerate(COMBOS)
+                if not self.mask & (1 << first | 1 << second)]
+        # Combos holding a board card keep a strength of 0.
+        self.strengths = array('H', bytes(2 * len(COMBOS)))
+        for combo, strength in zip(live, combo_strengths(
+                table or default_table(), board, live)):
+            self.strengths[combo] = strength
+        self.sorted = array('H', sorted(self.strengths[combo]
+                                        for combo in live))
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def strength(self, hole):
+        """
+        :param hole: 2 Cards, packed cards or card indices
+        :return: strength of hole on the board, 0 if it holds a board card
+        """
+        return self.strengths[combo_index(*map(card_index, hole))]
+
+    def counts(self, strength):
+        """
+        :return: (combos weaker than strength, combos as strong), over every
+                 combo not holding a board card
+        """
+        below = bisect_left(self.sorted, strength)
+        return below, bisect_right(self.sorted, strength) - below
+
+    def showdown(self, holes):
+        """
+        :return: Showdown of the hole cards of each player, see
+                 Evaluator.rank
+        """
+        return Evaluator.rank([self.strength(hole) for hole in holes])
+
+
+class BoardCache:
+
+    """ Least recently used cache of BoardScores.
+
+    Share one instance between tables and range queries to score each
+    board in use once.
+    """
+
+    def __init__(self, maxsize=1024, table=None):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError('Only positive integers allowed.')
+        self.maxsize = maxsize
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._boards = OrderedDict()
+
+    def __len__(self):
+        return len(self._boards)
+
+    def get(self, board):
+        """
+        :param board: 5 Cards, packed cards or card indices
+        :return: the BoardScores of board, scoring it on a miss
+        """
+        key = card_mask(board)
+        try:
+            scores = self._boards[key]
+        except KeyError:
+            self.misses += 1
+            scores = self._boards[key] = BoardScores(board, self.table)
+            if len(self._boards) > self.maxsize:
+                self._boards.popitem(last=False)
+            return scores
+        self._boards.move_to_end(key)
+        self.hits += 1
+        return scores
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._boards))
+
+    def clear(self):
+        self._boards.clear()
+        self.hits = self.misses = 0
+
+
+_cache = None
+
+
+def default_cache():
+    """
+    :return: the BoardCache shared by the process
+    """
+    global _cache
+    if _cache is None:
+        _cache = BoardCache()
+    return _cache
@@ -1,46 +1,317 @@
 from collections import namedtuple
-import random
+
+from pypoker.rng import new_rng
 
 
 Card = namedtuple('Card', ['rank', 'suit'])
 
+RANKS = '23456789TJQKA'
+SUITS = ('spades', 'diamonds', 'clubs', 'hearts')
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _pack(rank, suit):
+    return (1 << (16 + rank)) | (1 << (12 + suit)) | (rank << 8) | PRIMES[rank]
+
+
+# Every card that can exist, in CardsDeck order. The index of a card in
+# these tuples (suit * 13 + rank) is its card index.
+CARDS = tuple(Card(rank, suit) for suit in SUITS for rank in RANKS)
+INTS = tuple(_pack(rank, suit) for suit in range(4) for rank in range(13))
+
+_ENCODE = dict(zip(CARDS, INTS))
+_DECODE = dict(zip(INTS, CARDS))
+_INDEX = {value: index for index, value in enumerate(INTS)}
+
+
+def encode(card):
+    """
+    Packs a Card into an int laid out as:
+
+        xxxbbbbb bbbbbbbb ssssrrrr xxpppppp
+
+    rank bitmask: one bit set for the rank (2 = bit 16 ... A = bit 28)
+    suit: one bit set for the suit (spades, diamonds, clubs, hearts)
+    rank: 0 (deuce) to 12 (ace)
+    prime: prime number for the rank (deuce = 2 ... ace = 41)
+    """
+    try:
+        return _ENCODE[card]
+    except KeyError:
+        raise ValueError('Invalid card: {}'.format(card)) from None
+
+
+def decode(value):
+    """
+    :return: the Card packed in value
+    """
+    try:
+        return _DECODE[value]
+    except KeyError:
+        raise ValueError('Invalid card: {}'.format(value)) from None
+
+
+def card_rank(value):
+    """
+    :return: rank of a packed card, 2 to 14
+    """
+    return ((value >> 8) & 0xF) + 2
+
+
+def card_suit(value):
+    """
+    :return: suit bit of a packed card
+    """
+    return (value >> 12) & 0xF
+
+
+def pack_card(card):
+    """
+    :param card: Card, packed card or card index (0 to 51, see card_index)
+    :return: the packed card
+    """
+    if isinstance(card, int):
+        if 0 <= card < 52:
+            return INTS[card]
+        if card not in _INDEX:
+            raise ValueError('Invalid card: {}'.format(card))
+        return card
+    return encode(card)
+
+
+def pack_cards(cards):
+    """
+    :return: cards as a list of packed ints, see pack_card
+    """
+    return [pack_card(card) for card in cards]
+
+
+def card_index(card):
+    """
+    :return: position of a Card, packed card or card index in a new deck,
+             0 to 51
+    """
+    return _INDEX[pack_card(card)]
+
+
+# Card masks: 52-bit ints with bit card_index(card) set for each card.
+FULL_MASK = (1 << 52) - 1
+
+
+def card_mask(cards):
+    """
+    :param cards: Cards, packed cards or card indices
+    :return: the card mask of cards
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card_index(card)
+    return mask
+
+
+def mask_indices(mask):
+    """
+    :return: the card indices of the cards in a card mask, lowest first
+    """
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+class DeckDefinition:
+
+    """ The ranks a deck is made of, in all four suits.
+
+    wheel is the ace-low straight, as ranks from 2 to 14 sorted like
+    Hand.ranks (the ace and the 4 lowest ranks), None when the ace is not
+    in the deck. Unless flush_beats_full_house is given, the rarer of the
+    two hands ranks higher: full houses in a standard deck, flushes in a
+    short deck.
+    """
+
+    def __init__(self, name, ranks=RANKS, flush_beats_full_house=None):
+        if not set(ranks) <= set(RANKS) or len(set(ranks)) != len(ranks) \
+                or len(ranks) < 5:
+            raise ValueError('Invalid ranks: {}'.format(ranks))
+        self.name = name
+        self.ranks = ''.join(rank for rank in RANKS if rank in ranks)
+        self.indexes = tuple(RANKS.index(rank) for rank in self.ranks)
+        self.cards = tuple(card for card in CARDS if card.rank in self.ranks)
+        self.ints = tuple(_ENCODE[card] for card in self.cards)
+        self.wheel = None
+        if self.ranks[-1] == 'A' and len(self.ranks) > 5:
+            self.wheel = [14] + [index + 2 for index in
+                                 reversed(self.indexes[:4])]
+        if flush_beats_full_house is None:
+            size = len(self.ranks)
+            straights = size - 4 + (1 if self.wheel else 0)
+            flushes = 4 * (_choose(size, 5) - straights)
+            full_houses = size * (size - 1) * 4 * 6
+            flush_beats_full_house = flushes < full_houses
+        self.flush_beats_full_house = flush_beats_full_house
+
+    def _key(self):
+        return self.ranks, self.flush_beats_full_house
+
+    def __eq__(self, other):
+        return isinstance(other, DeckDefinition) and \
+            self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __repr__(self):
+        return 'DeckDefinition({!r}, {!r})'.format(self.name, self.ranks)
+
+
+def _choose(n, k):
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+DECKS = {deck.name: deck for deck in (
+    DeckDefinition('standard'),
+    DeckDefinition('shortdeck', '6789TJQKA'),
+    DeckDefinition('piquet', '789TJQKA'),
+)}
+STANDARD = DECKS['standard']
+
+
+def get_deck(deck=None):
+    """
+    :param deck: a DeckDefinition, the name of one in DECKS, or None for
+                 the standard deck
+    """
+    if deck is None:
+        return STANDARD
+    if isinstance(deck, DeckDefinition):
+        return deck
+    try:
+        return DECKS[deck]
+    except KeyError:
+        raise ValueError('Unknown deck: {}'.format(deck)) from None
+
 
 class CardsDeck:
 
     ''' Deck of cards representation.
         Jacks = 11, Queens = 12, Kings = 13, Aces = 14
+
+        The deck is one bytearray of card indices that is never resized:
+        dealing moves a cursor past the top card, and reset() puts the
+        cursor back.
+
+        rng is the generator used to shuffle, see pypoker.rng. Defaults to
+        the shared SecureRNG.
+
+        deck is the DeckDefinition (or the name of one, see get_deck) of
+        the ranks in the deck. Defaults to the standard 52 cards.
     '''
 
-    ranks = [str(x) for x in range(2, 10)] + list('TJQKA')
-    #ranks = [str(x) for x in range(2, 15)]
-    suits = ['spades', 'diamonds', 'clubs', 'hearts']
+    __slots__ = ('definition', '_cards', '_deck', '_top', 'rng')
+
+    suits = list(SUITS)
 
-    def __init__(self):
-        self._deck = [Card(rank, suit) for suit in self.suits
-                                            for rank in self.ranks]
+    def __init__(self, encoded=False, rng=None, deck=None):
+        self.definition = get_deck(deck)
+        # Cards (or packed cards) by card index, shared by every deck.
+        self._cards = INTS if encoded else CARDS
+        self._deck = bytearray(_INDEX[card] for card in self.definition.ints)
+        self._top = 0
+        self.rng = rng or new_rng()
+
+    @property
+    def ranks(self):
+        return list(self.definition.ranks)
+
+    def _index(self, card):
+        try:
+            return _INDEX[card if isinstance(card, int) else _ENCODE[card]]
+        except (KeyError, TypeError):
+            raise ValueError('Invalid card: {}'.format(card)) from None
 
     def __len__(self):
-        return len(self._deck)
+        return len(self._deck) - self._top
 
     def __getitem__(self, index):
-        return self._deck[index]
+        cards = self._cards
+        if isinstance(index, slice):
+            return [cards[n] for n in self._deck[self._top:][index]]
+        return cards[self._deck[self._position(index)]]
 
     def __setitem__(self, key, value):
-        self._deck[key] = value
-
-    def shuffle(self):
-        #random.shuffle(self._deck)
-        random.SystemRandom().shuffle(self._deck)
+        if isinstance(key, slice):
+            indexes = self._deck[self._top:]
+            indexes[key] = bytes(self._index(card) for card in value)
+            self._deck[self._top:] = indexes
+        else:
+            self._deck[self._position(key)] = self._index(value)
+
+    def _position(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('deck index out of range')
+        return self._top + index
+
+    def shuffle(self, n=None):
+        """
+        Fisher-Yates shuffle of the cards left in the deck, stopped after the
+        first n cards: enough to deal n random cards without touching the
+        rest of the deck. Shuffles the whole deck when n is None.
+        """
+        deck = self._deck
+        randbelow = self.rng.randbelow
+        size = len(deck)
+        top = self._top
+        stop = size - 1 if n is None else min(top + n, size - 1)
+        for i in range(top, stop):
+            j = i + randbelow(size - i)
+            deck[i], deck[j] = deck[j], deck[i]
 
     def deal(self):
-        return self._deck.pop(0)
+        if self._top >= len(self._deck):
+            raise IndexError('No more cards in the deck.')
+        card = self._cards[self._deck[self._top]]
+        self._top += 1
+        return card
+
+    def remove(self, cards):
+        """
+        Takes dead cards out of the deck, as if they were dealt.
+        """
+        deck = self._deck
+        for card in cards:
+            try:
+                i = deck.index(self._index(card), self._top)
+            except ValueError:
+                raise ValueError('{} is not in the deck.'.format(
+                    card)) from None
+            deck[self._top], deck[i] = deck[i], deck[self._top]
+            self._top += 1
+
+    def reset(self):
+        """
+        Returns every dealt and removed card to the deck, reusing its storage.
+        """
+        self._top = 0
 
     def __str__(self):
-        return str(list(self._deck))
+        return str(self[:])
 
 
 class Player:
 
+    __slots__ = ('_name', '_cards')
+
     def __init__(self, name):
         self._name = name
         self._cards = []
@@ -62,10 +333,12 @@ class Player:
 
 class Table:
 
-    def __init__(self, max_players=10):
+    __slots__ = ('_players', '_cards', '_deck', '_max_players')
+
+    def __init__(self, max_players=10, rng=None, deck=None):
         self._players = []
         self._cards = []
-        self._deck = CardsDeck()
+        self._deck = CardsDeck(rng=rng, deck=deck)
         self._max_players = max_players
 
     @property
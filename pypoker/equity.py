@@ -0,0 +1,377 @@
+"""
+Monte Carlo equity calculator.
+
+Completes the board at random for known hole cards and reports, for each
+player, how often they win outright, how often they tie, and their share of
+the pot (equity). Trials are split into fixed-size chunks, each drawing from
+its own stream split from the run seed (see pypoker.rng), and the chunks
+are spread across a process pool. The same seed gives the same result
+whatever the number of processes.
+
+adaptive_equity() samples until a target standard error is reached
+instead of running a fixed number of trials, and needs fewer boards to get
+there (see its docstring). exact_equity() enumerates every board.
+"""
+
+
+from collections import namedtuple
+from math import ceil, comb, factorial, sqrt
+import multiprocessing
+
+from pypoker.cards import INTS, pack_cards
+from pypoker.rng import SeededRNG
+from pypoker.statetable import FLUSH_SUITS, SUIT_COUNT, default_table
+
+
+EquityResult = namedtuple('EquityResult', ['win', 'tie', 'equity', 'stderr'])
+SimulationResult = namedtuple('SimulationResult', ['results', 'trials'])
+
+BOARD_SIZE = 5
+CHUNK_SIZE = 5000
+
+
+def _known_cards(hole_cards, board, dead):
+    hole_cards = [pack_cards(cards) for cards in hole_cards]
+    board = pack_cards(board)
+    dead = pack_cards(dead)
+    if len(hole_cards) < 2:
+        raise ValueError('At least 2 players are required.')
+    if len(board) > BOARD_SIZE:
+        raise ValueError('The board has at most {} cards.'.format(BOARD_SIZE))
+    known = [card for cards in hole_cards for card in cards] + board + dead
+    if len(set(known)) != len(known):
+        raise ValueError('The same card was given more than once.')
+    known = set(known)
+    deck = [card for card in INTS if card not in known]
+    return hole_cards, board, deck
+
+
+def _simulate(args):
+    """
+    Runs one chunk of trials.
+
+    :return: per player [wins, ties, sum of equity, sum of squared equity]
+    """
+    hole_cards, board, deck, trials, rng = args
+    evaluate = default_table().evaluate
+    sample = rng.sample
+    missing = BOARD_SIZE - len(board)
+    totals = [[0, 0, 0.0, 0.0] for _ in hole_cards]
+    for trial in range(trials):
+        full_board = board + sample(deck, missing)
+        strengths = [evaluate(cards + full_board) for cards in hole_cards]
+        best = max(strengths)
+        winners = strengths.count(best)
+        share = 1 / winners
+        for strength, total in zip(strengths, totals):
+            if strength == best:
+                if winners == 1:
+                    total[0] += 1
+                else:
+                    total[1] += 1
+                total[2] += share
+                total[3] += share * share
+    return totals
+
+
+def _results(totals, trials):
+    results = []
+    for wins, ties, equity, squares in totals:
+        mean = equity / trials
+        variance = max(squares / trials - mean * mean, 0.0)
+        results.append(EquityResult(wins / trials, ties / trials, mean,
+                                    sqrt(variance / trials)))
+    return results
+
+
+def equity(hole_cards, board=(), dead=(), trials=100000, processes=None,
+           seed=None):
+    """
+    :param hole_cards: list with the hole cards of each player
+    :param board: board cards already dealt, 0 to 5
+    :param dead: cards known to be out of the deck
+    :param trials: number of random board completions
+    :param processes: size of the process pool, None for one per core
+    :param seed: seed to reproduce a run, None for a random one
+    :return: list with an EquityResult per player
+    """
+    hole_cards, board, deck = _known_cards(hole_cards, board, dead)
+    if not isinstance(trials, int) or trials <= 0:
+        raise ValueError('Only positive integers allowed.')
+    rng = SeededRNG(seed)
+    chunks = [(hole_cards, board, deck, min(CHUNK_SIZE, trials - start),
+               rng.stream(n))
+              for n, start in enumerate(range(0, trials, CHUNK_SIZE))]
+
+    # Load (or generate) the table before forking so workers share it.
+    default_table()
+    if processes == 1 or len(chunks) == 1:
+        partials = map(_simulate, chunks)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            partials = pool.map(_simulate, chunks)
+        finally:
+            pool.close()
+            pool.join()
+
+    totals = [[0, 0, 0.0, 0.0] for _ in hole_cards]
+    for partial in partials:
+        for total, player in zip(totals, partial):
+            for n, value in enumerate(player):
+                total[n] += value
+    return _results(totals, trials)
+
+
+def _strata(cells, missing):
+    """
+    Splits the completions of the board by the number of cards they take
+    from each cell of the deck.
+
+    :return: list of (probability, cards taken from each cell)
+    """
+    strata = []
+
+    def walk(cell, left, counts, weight):
+        if cell == len(cells) - 1:
+            if left <= len(cells[cell]):
+                strata.append((weight * comb(len(cells[cell]), left),
+                               counts + (left,)))
+            return
+        for n in range(min(left, len(cells[cell])) + 1):
+            walk(cell + 1, left - n, counts + (n,),
+                 weight * comb(len(cells[cell]), n))
+
+    walk(0, missing, (), 1)
+    total = sum(weight for weight, _ in strata)
+    return [(weight / total, counts) for weight, counts in strata]
+
+
+def _shares(table, walks, rest):
+    """
+    :param walks: StateTable.walk of each player's hole cards and the board
+    :return: (win, tie, share of the pot) of each player once the cards in
+             rest complete the board
+    """
+    strengths = [table.strength(walk, rest) for walk in walks]
+    best = max(strengths)
+    winners = strengths.count(best)
+    return [(winners == 1, winners > 1, 1 / winners) if strength == best
+            else (False, False, 0.0) for strength in strengths]
+
+
+def adaptive_equity(hole_cards, board=(), dead=(), target_stderr=0.001,
+                    max_trials=1000000, batch=1000, seed=None):
+    """
+    Monte Carlo equity that stops as soon as the standard error of every
+    player's equity is at most target_stderr.
+
+    The deck is split in cells: one per rank held by a player, with the
+    cards of that rank, and one with the other cards. Completions of the
+    board are stratified by how many cards they take from each cell, which
+    is how often each player pairs the board, and each stratum is sampled
+    in proportion to its probability. Every board is paired with an
+    antithetic board: in each cell the cards are sorted and the i-th card
+    swapped with the i-th from the end, which permutes the suits of the
+    ranks held by the players and turns high cards into low ones elsewhere.
+
+    At most max_trials boards are evaluated. When that is too few to sample
+    every stratum twice, the likeliest strata are sampled first, strata
+    left out are dropped from the estimate and a stratum sampled once
+    counts with the largest possible variance, 1/4.
+
+    :param batch: boards sampled between two checks of the standard error
+    :return: SimulationResult(list with an EquityResult per player, number
+             of boards evaluated)
+    """
+    hole_cards, board, deck = _known_cards(hole_cards, board, dead)
+    if not isinstance(max_trials, int) or max_trials <= 0 or \
+            not isinstance(batch, int) or batch <= 0:
+        raise ValueError('Only positive integers allowed.')
+    if max_trials < 2:
+        raise ValueError('At least 2 trials are required.')
+    if target_stderr <= 0:
+        raise ValueError('The target standard error must be positive.')
+    table = default_table()
+    walks = [table.walk(hole + board) for hole in hole_cards]
+    if len(board) == BOARD_SIZE:
+        return SimulationResult([
+            EquityResult(float(win), float(tie), share, 0.0)
+            for win, tie, share in _shares(table, walks, [])], 1)
+
+    rng = SeededRNG(seed)
+
+    held = sorted({(card >> 8) & 0xF for hole in hole_cards for card in hole})
+    cells = [sorted(card for card in deck if (card >> 8) & 0xF == rank)
+             for rank in held]
+    cells.append(sorted(card for card in deck
+                        if (card >> 8) & 0xF not in held))
+    mirror = {card: cell[-1 - n] for cell in cells
+              for n, card in enumerate(cell)}
+    strata = sorted(_strata(cells, BOARD_SIZE - len(board)), reverse=True)
+    # Pairs of boards sampled and, per player, sums of win, tie, equity
+    # and squared equity of the pairs in each stratum.
+    pairs = [0] * len(strata)
+    sums = [[[0.0] * 4 for _ in hole_cards] for _ in strata]
+    trials = 0
+    while True:
+        budget = (max_trials - trials) // 2
+        total = sum(pairs) + min(max(batch // 2, 1), budget)
+        for n, (probability, counts) in enumerate(strata):
+            quota = max(ceil(probability * total), 2) - pairs[n]
+            for _ in range(max(min(quota, budget), 0)):
+                rest = [card for cell, count in zip(cells, counts)
+                        for card in rng.sample(cell, count)]
+                first = _shares(table, walks, rest)
+                second = _shares(table, walks, [mirror[card] for card in rest])
+                for player, one, two in zip(sums[n], first, second):
+                    equity = (one[2] + two[2]) / 2
+                    player[0] += (one[0] + two[0]) / 2
+                    player[1] += (one[1] + two[1]) / 2
+                    player[2] += equity
+                    player[3] += equity * equity
+                pairs[n] += 1
+                trials += 2
+                budget -= 1
+
+        covered = sum(probability for (probability, _), count
+                      in zip(strata, pairs) if count)
+        results = []
+        for player in range(len(hole_cards)):
+            win = tie = mean = variance = 0.0
+            for (probability, _), count, stratum in zip(strata, pairs, sums):
+                if not count:
+                    continue
+                probability /= covered
+                wins, ties, equity, squares = stratum[player]
+                win += probability * wins / count
+                tie += probability * ties / count
+                mean += probability * equity / count
+                spread = max(squares - equity * equity / count, 0.0) / \
+                    (count - 1) if count > 1 else 0.25
+                variance += probability * probability * spread / count
+            results.append(EquityResult(win, tie, mean, sqrt(variance)))
+        if max_trials - trials < 2 or \
+                max(result.stderr for result in results) <= target_stderr:
+            return SimulationResult(results, trials)
+
+
+def _free_suits(deck):
+    """
+    :return: suit bits of the suits with no known card
+    """
+    suits = [1 << (12 + n) for n in range(4)]
+    return [suit for suit in suits
+            if sum(1 for card in deck if card & suit) == 13]
+
+
+def exact_equity(hole_cards, board=(), dead=()):
+    """
+    Enumerates every completion of the board.
+
+    Suits with no known card are interchangeable, so boards that only differ
+    by a permutation of those suits are evaluated once and weighted by the
+    number of boards they stand for. Only the boards where the rank bitmasks
+    of the interchangeable suits are in non-increasing order are dealt,
+    which leaves exactly one board per class.
+
+    :return: list with an EquityResult per player, with a stderr of 0
+    """
+    hole_cards, board, deck = _known_cards(hole_cards, board, dead)
+    table = default_table()
+    transitions = table.table
+    flushes = table.flushes
+
+    # Cards of the free suits go last, grouped by suit from ace to deuce.
+    free = _free_suits(deck)
+    cards = [(card, None) for card in deck
+             if not any(card & suit for suit in free)]
+    for group, suit in enumerate(free):
+        cards += [(card, group) for card in reversed(deck) if card & suit]
+    masks = [0] * len(free)
+    ranks = [[] for _ in free]
+    board_cards = list(board)
+    players = range(len(hole_cards))
+    totals = [[0, 0, 0.0] for _ in players]
+    boards = [0]
+
+    def allowed(card, group):
+        # The ranks dealt to a free suit, read from the highest, must not
+        # exceed the ranks dealt to the previous free suit.
+        if not group:
+            return True
+        previous = ranks[group - 1]
+        current = ranks[group]
+        if current != previous[:len(current)]:
+            return True
+        return (len(previous) > len(current) and
+                (card >> 16) <= previous[len(current)])
+
+    def weight():
+        if len(masks) < 2:
+            return 1
+        result = factorial(len(masks))
+        for mask in set(masks):
+            result //= factorial(masks.count(mask))
+        return result
+
+    def score(states, suits, multiplier):
+        strengths = []
+        for player in players:
+            suit = FLUSH_SUITS[suits[player]]
+            if suit:
+                mask = 0
+                for card in hole_cards[player] + board_cards:
+                    if card & suit:
+                        mask |= card
+                strengths.append(flushes[mask >> 16])
+            else:
+                strengths.append(transitions[states[player] + 13])
+        best = max(strengths)
+        winners = strengths.count(best)
+        boards[0] += multiplier
+        for strength, total in zip(strengths, totals):
+            if strength == best:
+                total[0 if winners == 1 else 1] += multiplier
+                total[2] += multiplier / winners
+
+    def deal(start, missing, states, suits):
+        for n in range(start, len(cards) - missing + 1):
+            card, group = cards[n]
+            if not allowed(card, group):
+                continue
+            rank = (card >> 8) & 0xF
+            suit = SUIT_COUNT[(card >> 12) & 0xF]
+            if group is not None:
+                masks[group] |= card >> 16
+                ranks[group].append(card >> 16)
+            board_cards.append(card)
+            next_states = [transitions[state + rank] for state in states]
+            next_suits = [key + suit for key in suits]
+            if missing == 1:
+                score(next_states, next_suits, weight())
+            else:
+                deal(n + 1, missing - 1, next_states, next_suits)
+            board_cards.pop()
+            if group is not None:
+                masks[group] ^= card >> 16
+                ranks[group].pop()
+
+    states = []
+    suits = []
+    for hole in hole_cards:
+        state = 0
+        key = 0
+        for card in hole + board:
+            state = transitions[state + ((card >> 8) & 0xF)]
+            key += SUIT_COUNT[(card >> 12) & 0xF]
+        states.append(state)
+        suits.append(key)
+    if len(board) == BOARD_SIZE:
+        score(states, suits, 1)
+    else:
+        deal(0, BOARD_SIZE - len(board), states, suits)
+
+    return [EquityResult(wins / boards[0], ties / boards[0],
+                         shares / boards[0], 0.0)
+            for wins, ties, shares in totals]
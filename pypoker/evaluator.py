@@ -4,9 +4,15 @@ Most of the logic was borrowed from Professor's Peter Norvig CS212 course.
 """
 
 
-from collections import namedtuple, Counter
+from collections import namedtuple, Counter, OrderedDict
+
+from pypoker.cards import RANKS, decode, get_deck
 
 HandValue = namedtuple('HandValue', ['value', 'hand', 'ranks'])
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+Showdown = namedtuple('Showdown', ['winners', 'ties', 'ordering'])
+
+RANK_VALUES = {rank: value for value, rank in enumerate(RANKS, 2)}
 
 
 class Hand:
@@ -18,24 +24,123 @@ class Hand:
      Q = 12
      J = 11
      T = 10
+
+    cards can be Card namedtuples or packed ints (see cards.encode).
+
+    deck is the cards.DeckDefinition the cards come from, the standard deck
+    by default. Its wheel (the ace-low straight) is ranked with the ace
+    playing just below the lowest rank of the deck: [5, 4, 3, 2, 1] in a
+    standard deck, [9, 8, 7, 6, 5] in a short deck.
     """
 
-    def __init__(self, cards):
+    __slots__ = ('cards', 'deck', 'encoded', '_ranks', '_suits')
+
+    def __init__(self, cards, deck=None):
         self.cards = cards
-        self.ranks = self.convert_ranks()
-        self.suits = [card.suit for card in cards]
+        self.deck = get_deck(deck)
+        self.encoded = bool(cards) and isinstance(cards[0], int)
+        self._ranks = None
+        self._suits = None
+
+    @property
+    def ranks(self):
+        """
+        Ranks from 2 to 14, highest first, computed when first needed
+        """
+        if self._ranks is None:
+            self._ranks = self.convert_ranks()
+        return self._ranks
+
+    @property
+    def suits(self):
+        if self._suits is None:
+            if self.encoded:
+                self._suits = [(card >> 12) & 0xF for card in self.cards]
+            else:
+                self._suits = [card.suit for card in self.cards]
+        return self._suits
 
     def convert_ranks(self):
-        ranks = ['--23456789TJQKA'.index(card.rank) for card in self.cards]
+        if self.encoded:
+            ranks = [((card >> 8) & 0xF) + 2 for card in self.cards]
+        else:
+            ranks = [RANK_VALUES[card.rank] for card in self.cards]
         ranks.sort(reverse=True)
-        return ranks if ranks != [14, 5, 4, 3, 2] else [5, 4, 3, 2, 1]
+        if ranks == self.deck.wheel:
+            return ranks[1:] + [ranks[-1] - 1]
+        return ranks
 
     def __str__(self):
-        return str([[card.rank, card.suit] for card in self.cards])
+        cards = map(decode, self.cards) if self.encoded else self.cards
+        return str([[card.rank, card.suit] for card in cards])
 
     __repr__ = __str__
 
 
+class HandValueCache:
+
+    """ Least recently used cache of HandValues.
+
+    Hands are stored under a canonical key: the engine, the deck, the sorted
+    ranks and, only when 5 or more cards share a suit, the ranks of that suit. Any
+    hands with the same key have the same HandValue, whatever their order
+    or suits, so one entry serves all of them.
+
+    Share one instance between evaluations (or set Evaluator.cache) to
+    reuse values across hands, tables and players of a process.
+    """
+
+    def __init__(self, maxsize=100000):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError('Only positive integers allowed.')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    @staticmethod
+    def key(hand, engine='norvig'):
+        suits = hand.suits
+        flush = None
+        for suit in set(suits):
+            if suits.count(suit) >= 5:
+                cards = [card for card, suit_ in zip(hand.cards, suits)
+                         if suit_ == suit]
+                flush = tuple(Hand(cards, hand.deck).ranks)
+                break
+        return engine, hand.deck, tuple(hand.ranks), flush
+
+    def get(self, key):
+        """
+        :return: the HandValue cached under key, None if there is none
+        """
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._values))
+
+    def clear(self):
+        self._values.clear()
+        self.hits = self.misses = 0
+
+
 class Evaluator:
 
     """ Evaluates a given Hand object and returns a HandValue namedtuple
@@ -54,11 +159,31 @@ class Evaluator:
     One Pair:       HandValue(100, [self.kind(2)], ranks)
     High Card:      HandValue(0, None, ranks)
 
+    engine selects how the HandValue is computed:
+
+    'norvig': the predicates below, on all the cards of the hand
+    'lookup': the table driven evaluator in pypoker.lookup, on the best
+              5 cards of the hand
+    'state':  the state-transition table in pypoker.statetable, on the
+              best 5 cards of a 5 to 7 card hand
+
+    cache is an optional HandValueCache. Evaluator.cache is used when none
+    is given, so setting it shares one cache across the process.
+
     """
 
-    def __init__(self, hand):
+    engines = ('norvig', 'lookup', 'state')
+    cache = None
+
+    def __init__(self, hand, engine='norvig', cache=None):
+        if engine not in self.engines:
+            raise ValueError('Unknown engine: {}'.format(engine))
         self.hand = hand
-        # self.value = self.hand_value()
+        self.engine = engine
+        if cache is not None:
+            self.cache = cache
+        self._strength = None
+        self._value = None
 
     def _ranks_set(self):
         return sorted(list(set(self.hand.ranks)), reverse=True)
@@ -71,8 +196,9 @@ class Evaluator:
             return False
         all_suits = Counter(self.hand.suits)
         suit = [k for k,v in all_suits.items() if v == max(all_suits.values())][0]
-        cards = [card for card in self.hand.cards if card.suit == suit]
-        hand = Hand(cards)
+        cards = [card for card, suit_ in zip(self.hand.cards, self.hand.suits)
+                 if suit_ == suit]
+        hand = Hand(cards, self.hand.deck)
         max_ = max(hand.ranks)
         min_ = min(hand.ranks)
         return (len(hand.ranks) == 5 and (max_ - min_) == 4) or (len(
@@ -114,11 +240,47 @@ class Evaluator:
                 return rank
         return None
 
+    def strength(self):
+        """
+        :return: lookup table strength of the best 5 cards, 1 to 7462
+        """
+        if self._strength is None:
+            from pypoker import lookup
+            cards = lookup.packed(self.hand)
+            if self.engine == 'state':
+                from pypoker import statetable
+                self._strength = statetable.default_table(
+                    self.hand.deck).evaluate(cards)
+            else:
+                self._strength = lookup.deck_table(
+                    self.hand.deck).evaluate_best(cards)
+        return self._strength
+
     def hand_value(self):
+        """
+        :return: the HandValue of the hand, computed once per Evaluator
+        """
+        if self._value is None:
+            if self.cache is None:
+                self._value = self._hand_value()
+            else:
+                key = self.cache.key(self.hand, self.engine)
+                self._value = self.cache.get(key)
+                if self._value is None:
+                    self._value = self._hand_value()
+                    self.cache.put(key, self._value)
+        return self._value
+
+    def _hand_value(self):
+        if self.engine != 'norvig':
+            from pypoker.lookup import deck_table
+            return deck_table(self.hand.deck).hand_value(self.strength())
         if self.straight_flush():
             return HandValue(800, None, self.hand.ranks)
         elif self.kind(4):
             return HandValue(700, [self.kind(4)], self.hand.ranks)
+        elif self.hand.deck.flush_beats_full_house and self.flush():
+            return HandValue(500, None, self.hand.ranks)
         elif self.kind(3) and self.kind(2):
             return HandValue(600, [self.kind(3), self.kind(2)], None)
         elif self.flush():
@@ -134,34 +296,74 @@ class Evaluator:
         else:
             return HandValue(0, None, self.hand.ranks)
 
+    def key(self):
+        """
+        :return: an int ordering hands the same way as comparing their
+                 HandValues: category, then hand, then ranks. The
+                 strength when the engine is not 'norvig'.
+        """
+        if self.engine != 'norvig':
+            return self.strength()
+        value, hand, ranks = self.hand_value()
+        key = value // 100
+        if self.hand.deck.flush_beats_full_house and key in (5, 6):
+            key = 11 - key
+        for rank in (hand or []) + [0] * (2 - len(hand or [])):
+            key = key << 4 | rank
+        for rank in (ranks or []) + [0] * (7 - len(ranks or [])):
+            key = key << 4 | rank
+        return key
+
     def __gt__(self, other):
-        hand_value = self.hand_value()
-        other_value = other.hand_value()
-        if hand_value.value != other_value.value:
-            return hand_value.value > other_value.value
-        if hand_value.hand != other_value.hand:
-            try:
-                return hand_value.hand > other_value.hand
-            except TypeError:
-                print('hand_value: ', hand_value)
-                print('other_value: ', other_value)
-        if hand_value.ranks != other_value.ranks:
-            return hand_value.ranks > other_value.ranks
-        return False
+        return self.key() > other.key()
 
     def __eq__(self, other):
-        if self.hand == other.hand or self.hand_value() == other.hand_value():
+        if self.hand == other.hand:
             return True
-        else:
-            return False
+        return self.key() == other.key()
+
+    @classmethod
+    def keys(cls, hands, engine='norvig', cache=None):
+        """
+        :return: the key of each hand
+        """
+        return [cls(hand, engine, cache).key() for hand in hands]
+
+    @classmethod
+    def best_hand(cls, hands, engine='norvig', cache=None):
+        keys = cls.keys(hands, engine, cache)
+        if not keys:
+            return []
+        best = max(keys)
+        return [hand for hand, key in zip(hands, keys) if key == best]
 
     @classmethod
-    def best_hand(cls, hands):
-        best_hand_ = []
-        for hand in hands:
-            hand_value = cls(hand)
-            if not best_hand_ or hand_value > cls(best_hand_[0]):
-                best_hand_ = [hand]
-            elif hand_value == cls(best_hand_[0]):
-                best_hand_.append(hand)
-        return best_hand_
+    def showdown(cls, hands, engine='norvig', cache=None):
+        """
+        Ranks hands in one pass: each hand is evaluated once and the hands
+        are sorted on their keys.
+
+        :return: Showdown(winners, ties, ordering) where ordering lists the
+                 groups of tied hand indexes from the best to the worst,
+                 winners is the first group and ties are the groups with
+                 more than one hand
+        """
+        return cls.rank(cls.keys(hands, engine, cache))
+
+    @staticmethod
+    def rank(keys):
+        """
+        :return: Showdown of the hand indexes, from their keys (see
+                 showdown)
+        """
+        ordering = []
+        previous = None
+        for index in sorted(range(len(keys)), key=keys.__getitem__,
+                            reverse=True):
+            if keys[index] != previous:
+                ordering.append([])
+                previous = keys[index]
+            ordering[-1].append(index)
+        return Showdown(ordering[0] if ordering else [],
+                        [group for group in ordering if len(group) > 1],
+                        ordering)
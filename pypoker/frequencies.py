@@ -0,0 +1,126 @@
+"""
+Exact number of hands of each category, over every hand of 5 to 7 cards
+of a deck (133,784,560 hands of 7 cards from a standard deck).
+
+Hands are not enumerated one by one. Every multiset of ranks is walked
+once through the state table (see pypoker.statetable) and counts for all
+the ways to give its cards suits, prod(C(4, n)) over the ranks. Those
+counts rank every hand as if it held no flush. The flushes are then
+counted on their own, from the ranks in the flush suit and the ranks of
+the other cards, and moved to the category of their best hand. With at
+most 7 cards, at most one suit holds 5 or more of them.
+
+The counts double as an oracle for any evaluator: strength_counts()
+gives how many hands there are of every strength.
+"""
+
+
+from collections import Counter
+from itertools import combinations
+from math import comb
+import argparse
+import sys
+
+from pypoker.cards import get_deck
+from pypoker.lookup import deck_table
+from pypoker.statetable import MAX_CARDS, default_table
+
+
+NAMES = {
+    800: 'Straight Flush',
+    700: 'Four of a Kind',
+    600: 'Full House',
+    500: 'Flush',
+    400: 'Straight',
+    300: 'Three of Kind',
+    200: 'Two Pair',
+    100: 'One Pair',
+    0: 'High Card',
+}
+
+
+def _multisets(transitions, ranks, cards, copies, state=0, ways=1,
+               position=0):
+    """
+    Yields (state, ways) for every multiset of cards ranks with at most
+    copies cards of a rank, ways being the number of ways to pick the
+    cards of each rank among copies.
+    """
+    if not cards:
+        yield state, ways
+        return
+    if position == len(ranks):
+        return
+    rank = ranks[position]
+    for n in range(min(copies, cards) + 1):
+        if n:
+            state = transitions[state + rank]
+        yield from _multisets(transitions, ranks, cards - n, copies, state,
+                              ways * comb(copies, n), position + 1)
+
+
+def strength_counts(cards=7, deck=None):
+    """
+    :param cards: number of cards in a hand, 5 to 7
+    :param deck: cards.DeckDefinition or its name, the standard deck when
+                 None
+    :return: Counter of {strength: number of hands}, see pypoker.lookup
+    """
+    deck = get_deck(deck)
+    if not 5 <= cards <= MAX_CARDS:
+        raise ValueError('Between 5 and {} cards are required.'.format(
+            MAX_CARDS))
+    table = default_table(deck)
+    transitions = table.table
+    flushes = table.flushes
+    ranks = deck.indexes
+
+    counts = Counter()
+    for state, ways in _multisets(transitions, ranks, cards, 4):
+        counts[transitions[state + 13]] += ways
+
+    for suited in range(5, cards + 1):
+        for flush in combinations(ranks, suited):
+            state = 0
+            mask = 0
+            for rank in flush:
+                state = transitions[state + rank]
+                mask |= 1 << rank
+            strength = flushes[mask]
+            # The other cards come from the 3 other suits, 4 flush suits.
+            for other, ways in _multisets(transitions, ranks, cards - suited,
+                                          3, state):
+                plain = transitions[other + 13]
+                counts[plain] -= 4 * ways
+                counts[max(plain, strength)] += 4 * ways
+    return +counts
+
+
+def frequencies(cards=7, deck=None):
+    """
+    :return: {category: number of hands}, from 800 (Straight Flush) to
+             0 (High Card), see strength_counts
+    """
+    category = deck_table(deck).category
+    result = dict.fromkeys(sorted(NAMES, reverse=True), 0)
+    for strength, count in strength_counts(cards, deck).items():
+        result[category(strength)] += count
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pypoker.frequencies')
+    parser.add_argument('--cards', type=int, default=7)
+    parser.add_argument('--deck')
+    args = parser.parse_args(argv)
+    result = frequencies(args.cards, args.deck)
+    total = sum(result.values())
+    for category, count in result.items():
+        print('{:<16} {:>12,} {:>10.6f} %'.format(
+            NAMES[category], count, 100 * count / total))
+    print('{:<16} {:>12,}'.format('Total', total))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Binary hand histories.
+
+A history file is a 16-byte header followed by fixed-width 128-byte
+records, one per hand, all little-endian:
+
+    hand_id      uint64
+    seats        uint8     seats dealt in, up to MAX_SEATS
+    hole_count   uint8     hole cards per seat, up to MAX_HOLE_CARDS
+    board_count  uint8     board cards, up to MAX_BOARD_CARDS
+    flags        uint8     reserved
+    winners      uint16    bitmask of the winning seats
+    hole_cards   MAX_SEATS * MAX_HOLE_CARDS uint8, seat after seat
+    board        MAX_BOARD_CARDS uint8
+    bets         MAX_SEATS int32, chips put in the pot by each seat
+
+Cards are stored as card indices (see cards.card_index), NO_CARD for
+unused slots. HandHistoryWriter appends records through a buffer and
+HandHistoryReader memory-maps a file and decodes records only when they are
+accessed.
+"""
+
+
+from collections import namedtuple
+import mmap
+import os
+import struct
+
+from pypoker.cards import card_index
+
+
+HandRecord = namedtuple('HandRecord', ['hand_id', 'hole_cards', 'board',
+                                       'bets', 'winners'])
+
+MAX_SEATS = 10
+MAX_HOLE_CARDS = 6
+MAX_BOARD_CARDS = 5
+NO_CARD = 255
+VERSION = 1
+
+HEADER = struct.Struct('<4sHH8x')
+RECORD = struct.Struct('<QBBBBH2x{}s{}s3x{}i4x'.format(
+    MAX_SEATS * MAX_HOLE_CARDS, MAX_BOARD_CARDS, MAX_SEATS))
+_MAGIC = b'PKHH'
+
+
+def _card_bytes(cards, size):
+    indexes = [card_index(card) for card in cards]
+    return bytes(indexes + [NO_CARD] * (size - len(indexes)))
+
+
+class HandHistoryWriter:
+
+    """ Appends hand records to a history file.
+
+    Records are packed into a buffer of buffer_size records and written
+    when it is full, on flush() and on close().
+    """
+
+    def __init__(self, path, buffer_size=4096):
+        exists = os.path.exists(path) and os.path.getsize(path)
+        self._file = open(path, 'ab')
+        if exists:
+            with open(path, 'rb') as file:
+                _check_header(file.read(HEADER.size), path)
+        else:
+            self._file.write(HEADER.pack(_MAGIC, VERSION, RECORD.size))
+        self.path = path
+        self._buffer = bytearray(RECORD.size * buffer_size)
+        self._pending = 0
+        self.count = 0
+
+    def write(self, hand_id, hole_cards, board=(), bets=(), winners=()):
+        """
+        :param hole_cards: list with the hole cards of each seat
+        :param board: board cards
+        :param bets: chips put in the pot by each seat
+        :param winners: indexes of the winning seats
+        """
+        seats = len(hole_cards)
+        hole_count = max(map(len, hole_cards), default=0)
+        if seats > MAX_SEATS or hole_count > MAX_HOLE_CARDS or \
+                len(board) > MAX_BOARD_CARDS or len(bets) > seats:
+            raise ValueError('Hand does not fit in a record.')
+        if any(not 0 <= seat < seats for seat in winners):
+            raise ValueError('Winners must be seats of the hand.')
+        hole = b''.join(_card_bytes(cards, hole_count)
+                        for cards in hole_cards)
+        hole += bytes([NO_CARD]) * (MAX_SEATS * MAX_HOLE_CARDS - len(hole))
+        mask = 0
+        for seat in winners:
+            mask |= 1 << seat
+        RECORD.pack_into(self._buffer, self._pending * RECORD.size,
+                         hand_id, seats, hole_count, len(board), 0, mask,
+                         hole,
+                         _card_bytes(board, MAX_BOARD_CARDS),
+                         *(list(bets) + [0] * (MAX_SEATS - len(bets))))
+        self._pending += 1
+        self.count += 1
+        if self._pending * RECORD.size == len(self._buffer):
+            self.flush()
+
+    def record(self, table, hand_id=None, bets=(), winners=None):
+        """
+        Writes the cards dealt at a PokerTable, one seat per player.
+
+        :param hand_id: defaults to the number of records written so far
+        :param winners: seat indexes, defaults to the winners of
+                        table.showdown()
+        """
+        players = table.players
+        if winners is None:
+            winners = [players.index(player)
+                       for player in table.showdown().winners]
+        self.write(self.count if hand_id is None else hand_id,
+                   [player.cards for player in players], table.cards, bets,
+                   winners)
+
+    def flush(self):
+        self._file.write(memoryview(self._buffer)[
+            :self._pending * RECORD.size])
+        self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(header, path):
+    if len(header) != HEADER.size:
+        raise ValueError('Invalid hand history: {}'.format(path))
+    magic, version, size = HEADER.unpack(header)
+    if magic != _MAGIC or version != VERSION or size != RECORD.size:
+        raise ValueError('Invalid hand history: {}'.format(path))
+
+
+class HandHistoryReader:
+
+    """ Random access to the records of a memory-mapped history file.
+
+    reader[n] decodes one HandRecord, iterating decodes them one at a time,
+    and raw(n) returns the bytes of a record without decoding it.
+
+    Views from raw() and arrays from as_array() read the mapped file in
+    place: delete them before close(), which raises BufferError while any
+    of them is alive.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            _check_header(file.read(HEADER.size), path)
+            size = os.fstat(file.fileno()).st_size
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._count = (size - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def _offset(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('record index out of range')
+        return HEADER.size + index * RECORD.size
+
+    def raw(self, index):
+        """
+        :return: memoryview of the bytes of a record
+        """
+        offset = self._offset(index)
+        return self._view[offset:offset + RECORD.size]
+
+    def __getitem__(self, index):
+        fields = RECORD.unpack_from(self._mmap, self._offset(index))
+        hand_id, seats, hole_count, board_count, flags, mask, hole, board = \
+            fields[:8]
+        return HandRecord(
+            hand_id,
+            tuple(tuple(hole[seat * hole_count:(seat + 1) * hole_count])
+                  for seat in range(seats)),
+            tuple(board[:board_count]),
+            fields[8:8 + seats],
+            tuple(seat for seat in range(seats) if mask >> seat & 1))
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def as_array(self):
+        """
+        :return: a NumPy structured array viewing the records in place
+        """
+        import numpy as np
+        dtype = np.dtype([
+            ('hand_id', '<u8'), ('seats', 'u1'), ('hole_count', 'u1'),
+            ('board_count', 'u1'), ('flags', 'u1'), ('winners', '<u2'),
+            ('pad', 'V2'),
+            ('hole_cards', 'u1', (MAX_SEATS * MAX_HOLE_CARDS,)),
+            ('board', 'u1', (MAX_BOARD_CARDS,)), ('pad2', 'V3'),
+            ('bets', '<i4', (MAX_SEATS,)), ('pad3', 'V4')])
+        return np.frombuffer(self._mmap, dtype=dtype, count=self._count,
+                             offset=HEADER.size)
+
+    def close(self):
+        """
+        Unmaps the file.
+
+        :raises BufferError: when views from raw() or arrays from
+                             as_array() are still alive; the reader stays
+                             open
+        """
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            self._view = memoryview(self._mmap)
+            raise BufferError('Views of the records are still alive; delete '
+                              'them before closing the reader.') from None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,259 @@
+"""
+Table driven 5-card hand evaluator.
+
+Every 5-card hand maps to a single integer strength between 1 (7-5-4-3-2
+offsuit) and 7462 (royal flush); the higher the strength, the better the
+hand. Hands are looked up from packed cards (see cards.encode) using:
+
+- the OR of the rank bitmasks for flushes and hands with 5 unique ranks
+- the product of the rank primes for every other hand
+"""
+
+
+from bisect import bisect_right
+from itertools import combinations
+
+from pypoker.cards import encode, get_deck
+from pypoker.evaluator import HandValue
+
+
+STRAIGHTS = [0b1111100000000 >> n for n in range(9)] + [0b1000000001111]
+
+CATEGORIES = (0, 100, 200, 300, 400, 500, 600, 700, 800)
+
+
+class LookupTable:
+
+    """ Lookup tables for every 5-card equivalence class.
+
+    flushes:  rank bitmask -> strength, for suited hands
+    unique5:  rank bitmask -> strength, for unsuited hands with 5 ranks
+    products: prime product -> strength, for all the other hands
+    values:   strength -> HandValue, as reported by Evaluator
+    bounds:   lowest strength of each category, from High Card up
+
+    The rules default to standard poker. straights lists the straight rank
+    bitmasks from the highest (see straights()), and flush_beats_full_house
+    ranks flushes above full houses, as in short deck.
+    """
+
+    def __init__(self, straights=None, flush_beats_full_house=False):
+        self.straights = list(STRAIGHTS if straights is None else straights)
+        self.flush_beats_full_house = flush_beats_full_house
+        self.categories = CATEGORIES
+        if flush_beats_full_house:
+            self.categories = CATEGORIES[:5] + (600, 500) + CATEGORIES[7:]
+        self.flushes = [0] * 8192
+        self.unique5 = [0] * 8192
+        self.products = {}
+        self.values = [None]
+        self.bounds = []
+        self._build()
+
+    def _add(self, value, ranks, hand=None, keep_ranks=True, low=False):
+        ranks = sorted(ranks, reverse=True)
+        if low:
+            # The ace of an ace-low straight plays below the lowest rank.
+            ranks = ranks[1:] + [ranks[-1] - 1]
+        self.values.append(HandValue(value, hand, ranks if keep_ranks
+                                     else None))
+        return len(self.values) - 1
+
+    def _build(self):
+        primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+        ranks = range(13)
+        straights = {mask: n for n, mask in enumerate(reversed(
+            self.straights))}
+        ace_low = self.straights[-1] if self.straights and \
+            self.straights[-1] & 0x1000 and not self.straights[-1] & 0x800 \
+            else None
+        highs = [combo for combo in self._ordered(ranks, 5)
+                 if self._mask(combo) not in straights]
+
+        def product(counts):
+            result = 1
+            for rank, count in counts:
+                result *= primes[rank] ** count
+            return result
+
+        def ranks_of(counts):
+            return [rank + 2 for rank, count in counts
+                    for _ in range(count)]
+
+        # High Card
+        self.bounds.append(len(self.values))
+        for combo in highs:
+            self.unique5[self._mask(combo)] = self._add(0, ranks_of(
+                (rank, 1) for rank in combo))
+        # One Pair
+        self.bounds.append(len(self.values))
+        for pair in ranks:
+            kickers = [rank for rank in ranks if rank != pair]
+            for combo in self._ordered(kickers, 3):
+                counts = [(pair, 2)] + [(rank, 1) for rank in combo]
+                self.products[product(counts)] = self._add(
+                    100, ranks_of(counts), [pair + 2])
+        # Two Pair
+        self.bounds.append(len(self.values))
+        for high in ranks:
+            for low in range(high):
+                for kicker in ranks:
+                    if kicker in (high, low):
+                        continue
+                    counts = [(high, 2), (low, 2), (kicker, 1)]
+                    self.products[product(counts)] = self._add(
+                        200, ranks_of(counts), [high + 2, low + 2])
+        # Three of Kind
+        self.bounds.append(len(self.values))
+        for trips in ranks:
+            kickers = [rank for rank in ranks if rank != trips]
+            for combo in self._ordered(kickers, 2):
+                counts = [(trips, 3)] + [(rank, 1) for rank in combo]
+                self.products[product(counts)] = self._add(
+                    300, ranks_of(counts), [trips + 2], keep_ranks=False)
+        # Straight
+        self.bounds.append(len(self.values))
+        for mask in straights:
+            combo = [rank for rank in ranks if mask >> rank & 1]
+            self.unique5[mask] = self._add(400, ranks_of(
+                (rank, 1) for rank in combo), low=mask == ace_low)
+        def flush():
+            self.bounds.append(len(self.values))
+            for combo in highs:
+                self.flushes[self._mask(combo)] = self._add(500, ranks_of(
+                    (rank, 1) for rank in combo))
+
+        def full_house():
+            self.bounds.append(len(self.values))
+            for trips in ranks:
+                for pair in ranks:
+                    if pair == trips:
+                        continue
+                    counts = [(trips, 3), (pair, 2)]
+                    self.products[product(counts)] = self._add(
+                        600, ranks_of(counts), [trips + 2, pair + 2],
+                        keep_ranks=False)
+
+        # Flush and Full House, in the order of the rules
+        if self.flush_beats_full_house:
+            full_house()
+            flush()
+        else:
+            flush()
+            full_house()
+        # Four of a Kind
+        self.bounds.append(len(self.values))
+        for quads in ranks:
+            for kicker in ranks:
+                if kicker == quads:
+                    continue
+                counts = [(quads, 4), (kicker, 1)]
+                self.products[product(counts)] = self._add(
+                    700, ranks_of(counts), [quads + 2])
+        # Straight Flush
+        self.bounds.append(len(self.values))
+        for mask in straights:
+            combo = [rank for rank in ranks if mask >> rank & 1]
+            self.flushes[mask] = self._add(800, ranks_of(
+                (rank, 1) for rank in combo), low=mask == ace_low)
+
+    @staticmethod
+    def _ordered(ranks, n):
+        """
+        :return: n-rank combinations from the weakest to the strongest kickers
+        """
+        return sorted(combinations(ranks, n),
+                      key=lambda combo: sorted(combo, reverse=True))
+
+    @staticmethod
+    def _mask(ranks):
+        mask = 0
+        for rank in ranks:
+            mask |= 1 << rank
+        return mask
+
+    @property
+    def max_strength(self):
+        return len(self.values) - 1
+
+    def evaluate(self, cards):
+        """
+        :return: strength of exactly 5 packed cards
+        """
+        c1, c2, c3, c4, c5 = cards
+        mask = (c1 | c2 | c3 | c4 | c5) >> 16
+        if c1 & c2 & c3 & c4 & c5 & 0xF000:
+            return self.flushes[mask]
+        strength = self.unique5[mask]
+        if strength:
+            return strength
+        return self.products[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) *
+                             (c4 & 0xFF) * (c5 & 0xFF)]
+
+    def evaluate_best(self, cards):
+        """
+        :return: strength of the best 5-card hand among 5 or more cards
+        """
+        if len(cards) == 5:
+            return self.evaluate(cards)
+        return max(map(self.evaluate, combinations(cards, 5)))
+
+    def category(self, strength):
+        """
+        :return: category of a strength, 800 (Straight Flush) to 0 (High Card)
+        """
+        return self.categories[bisect_right(self.bounds, strength) - 1]
+
+    def hand_value(self, strength):
+        """
+        :return: HandValue of a strength
+        """
+        return self.values[strength]
+
+
+def straights(ranks):
+    """
+    :param ranks: ranks in play, as indexes into cards.RANKS
+    :return: rank bitmasks of the straights made of 5 consecutive ranks in
+             play, from the highest, then the ace-low straight (the ace with
+             the 4 lowest ranks) when the ace is in play
+    """
+    ranks = sorted(ranks)
+    masks = [sum(1 << rank for rank in ranks[n:n + 5])
+             for n in range(len(ranks) - 5, -1, -1)]
+    if ranks and ranks[-1] == 12 and len(ranks) > 5:
+        masks.append(sum(1 << rank for rank in ranks[:4]) | 1 << 12)
+    return masks
+
+
+_tables = {}
+
+
+def default_table(straights=None, flush_beats_full_house=False):
+    """
+    :return: the LookupTable for the given rules shared by the whole
+             process, built on first use; the standard rules by default
+    """
+    key = (tuple(STRAIGHTS if straights is None else straights),
+           flush_beats_full_house)
+    if key not in _tables:
+        _tables[key] = LookupTable(*key)
+    return _tables[key]
+
+
+def deck_table(deck=None):
+    """
+    :param deck: cards.DeckDefinition or its name, the standard deck when None
+    :return: the shared LookupTable ranking hands dealt from deck
+    """
+    deck = get_deck(deck)
+    return default_table(straights(deck.indexes), deck.flush_beats_full_house)
+
+
+def packed(hand):
+    """
+    :return: the cards of a Hand as packed ints
+    """
+    if hand.encoded:
+        return hand.cards
+    return [encode(card) for card in hand.cards]
@@ -0,0 +1,267 @@
+"""
+Hot-path instrumentation.
+
+enable() replaces the instrumented methods (dealing, hand evaluation,
+showdowns and every Evaluator predicate) with timed wrappers, and disable()
+puts the original methods back, so nothing is measured, and nothing is
+paid, while metrics are disabled. Measurements are read with snapshot() or
+exported in the Prometheus text format with export_text().
+
+Without changing any code, a run is instrumented by setting environment
+variables before pypoker is imported:
+
+    PYPOKER_METRICS=1          enable() on import
+    PYPOKER_PROFILE=out.txt    run a SamplingProfiler until exit and write
+                               its collapsed stacks (flame graph input)
+"""
+
+
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
+from time import perf_counter
+import atexit
+import importlib
+import sys
+import threading
+
+
+# (module, class, method) timed by enable()
+TARGETS = [
+    ('pypoker.poker', 'PokerTable', 'deal_cards'),
+    ('pypoker.poker', 'PokerTable', 'showdown'),
+    ('pypoker.evaluator', 'Evaluator', 'hand_value'),
+    ('pypoker.evaluator', 'Evaluator', 'best_hand'),
+    ('pypoker.evaluator', 'Evaluator', 'showdown'),
+    ('pypoker.evaluator', 'Evaluator', 'straight_flush'),
+    ('pypoker.evaluator', 'Evaluator', 'straight'),
+    ('pypoker.evaluator', 'Evaluator', 'flush'),
+    ('pypoker.evaluator', 'Evaluator', 'two_pair'),
+    ('pypoker.evaluator', 'Evaluator', 'kind'),
+]
+
+# Upper bounds of the histogram buckets, in seconds: 1 us to about 1 s.
+BUCKETS = tuple(1e-6 * 2 ** n for n in range(21))
+
+
+class Histogram:
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def snapshot(self):
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': list(self.buckets)}
+
+
+_histograms = {}
+_caches = {}
+_originals = {}
+
+
+def histogram(name):
+    """
+    :return: the Histogram registered as name, created on first use
+    """
+    if name not in _histograms:
+        _histograms[name] = Histogram()
+    return _histograms[name]
+
+
+def watch_cache(name, cache):
+    """
+    Reports the hit rate of a cache with an info() method returning hits
+    and misses, such as evaluator.HandValueCache.
+    """
+    _caches[name] = cache
+
+
+def _timed(name, function):
+    observe = histogram(name).observe
+
+    @wraps(function)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            observe(perf_counter() - start)
+    return timed
+
+
+def enabled():
+    return bool(_originals)
+
+
+def enable():
+    """
+    Starts timing every method in TARGETS.
+    """
+    for module, owner, method in TARGETS:
+        if (module, owner, method) in _originals:
+            continue
+        cls = getattr(importlib.import_module(module), owner)
+        original = cls.__dict__[method]
+        name = '{}.{}'.format(owner, method)
+        if isinstance(original, classmethod):
+            wrapper = classmethod(_timed(name, original.__func__))
+        else:
+            wrapper = _timed(name, original)
+        _originals[module, owner, method] = original
+        setattr(cls, method, wrapper)
+
+
+def disable():
+    """
+    Restores the original methods. Measurements are kept until reset().
+    """
+    for (module, owner, method), original in _originals.items():
+        setattr(getattr(sys.modules[module], owner), method, original)
+    _originals.clear()
+
+
+def reset():
+    _histograms.clear()
+
+
+def _cache_stats():
+    caches = dict(_caches)
+    evaluator = sys.modules.get('pypoker.evaluator')
+    if evaluator is not None and evaluator.Evaluator.cache is not None:
+        caches.setdefault('evaluator', evaluator.Evaluator.cache)
+    stats = {}
+    for name, cache in caches.items():
+        info = cache.info()
+        lookups = info.hits + info.misses
+        stats[name] = {'hits': info.hits, 'misses': info.misses,
+                       'hit_rate': info.hits / lookups if lookups else 0.0}
+    return stats
+
+
+def snapshot():
+    """
+    :return: {'enabled': bool,
+              'timings': {name: {'count', 'sum', 'buckets'}},
+              'caches': {name: {'hits', 'misses', 'hit_rate'}}}
+    """
+    return {'enabled': enabled(),
+            'timings': {name: histogram_.snapshot()
+                        for name, histogram_ in sorted(_histograms.items())},
+            'caches': _cache_stats()}
+
+
+def _metric(name):
+    return 'pypoker_' + ''.join(
+        '_' + char.lower() if char.isupper() else char
+        for char in name.replace('.', '_')).replace('__', '_').strip('_')
+
+
+def export_text(data=None):
+    """
+    :return: a snapshot in the Prometheus text exposition format
+    """
+    data = data or snapshot()
+    lines = []
+    for name, timing in data['timings'].items():
+        metric = _metric(name) + '_seconds'
+        lines.append('# TYPE {} histogram'.format(metric))
+        total = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), timing['buckets']):
+            total += count
+            lines.append('{}_bucket{{le="{}"}} {}'.format(metric, bound,
+                                                          total))
+        lines.append('{}_sum {}'.format(metric, timing['sum']))
+        lines.append('{}_count {}'.format(metric, timing['count']))
+    for field in ('hits', 'misses'):
+        if data['caches']:
+            lines.append('# TYPE pypoker_cache_{} counter'.format(field))
+        for name, stats in data['caches'].items():
+            lines.append('pypoker_cache_{}{{cache="{}"}} {}'.format(
+                field, name, stats[field]))
+    return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+
+    """ Statistical profiler sampling the stack of one thread.
+
+    A daemon thread records the stack of the profiled thread every interval
+    seconds. The profiled code runs unmodified; the cost is one stack walk
+    per sample.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append('{}:{}'.format(code.co_filename.rsplit('/', 1)[-1],
+                                            code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def collapsed(self):
+        """
+        :return: one 'frame;frame;frame count' line per sampled stack
+        """
+        return ''.join('{} {}\n'.format(stack, count)
+                       for stack, count in self.stacks.most_common())
+
+
+def profile_to(path, interval=0.005):
+    """
+    Profiles the main thread until the interpreter exits, then writes the
+    collapsed stacks to path.
+    """
+    profiler = SamplingProfiler(interval).start()
+
+    def write():
+        profiler.stop()
+        with open(path, 'w') as file:
+            file.write(profiler.collapsed())
+    atexit.register(write)
+    return profiler
+
+
+def configure(environ):
+    """
+    Applies PYPOKER_METRICS and PYPOKER_PROFILE, see the module docstring.
+    """
+    if environ.get('PYPOKER_METRICS', '') not in ('', '0'):
+        enable()
+    if environ.get('PYPOKER_PROFILE'):
+        profile_to(environ['PYPOKER_PROFILE'])
@@ -0,0 +1,96 @@
+"""
+Outs: the unseen cards that improve a hand on the next street.
+
+Sets of cards are card masks (see cards.card_mask): 52-bit ints with bit
+card_index(card) set for each card, so they combine and test with integer
+operations. The hero and every opponent are walked through the state table
+(see StateTable.walk) once, with the board; each unseen card then costs
+one transition and one lookup per player, without building a Hand.
+
+Categories are those of Evaluator.hand_value, 800 (Straight Flush) to
+0 (High Card).
+"""
+
+
+from bisect import bisect_right
+from collections import namedtuple
+
+from pypoker.cards import INTS, card_mask, get_deck, mask_indices, \
+    pack_cards
+from pypoker.lookup import deck_table
+from pypoker.statetable import MAX_CARDS, default_table
+
+Outs = namedtuple('Outs', ['category', 'unseen', 'categories', 'improving',
+                           'leading', 'tying', 'counts'])
+Outs.__doc__ = """
+category:   category of the hero's hand with the board
+unseen:     mask of the cards that may come next
+categories: {card index: category of the hero's hand with that card}
+improving:  mask of the unseen cards raising the hero's category
+leading:    mask of the unseen cards after which the hero beats every
+            opponent, all of them when no opponent is known
+tying:      mask of the unseen cards after which the hero ties for the best
+            hand
+counts:     {category: number of improving cards reaching it}
+"""
+
+
+def outs(hole, board, opponents=(), dead=(), deck=None):
+    """
+    :param hole: the hero's Cards, packed cards or card indices
+    :param board: the flop or the turn, 3 or 4 cards
+    :param opponents: hole cards of the opponents whose cards are known
+    :param dead: other cards known to be out of the deck
+    :param deck: cards.DeckDefinition or its name, the standard deck when
+                 None
+    :return: Outs of the next card
+    """
+    deck = get_deck(deck)
+    hole = pack_cards(hole)
+    board = pack_cards(board)
+    opponents = [pack_cards(cards) for cards in opponents]
+    dead = pack_cards(dead)
+    if len(board) not in (3, 4):
+        raise ValueError('The board must have 3 or 4 cards.')
+    if not 5 <= len(hole) + len(board) + 1 <= MAX_CARDS or any(
+            len(cards) != len(hole) for cards in opponents):
+        raise ValueError('Between 5 and {} cards are required.'.format(
+            MAX_CARDS))
+    known = hole + board + dead + [card for cards in opponents
+                                   for card in cards]
+    known_mask = card_mask(known)
+    if bin(known_mask).count('1') != len(known):
+        raise ValueError('The same card is dealt twice.')
+    unseen = card_mask(deck.ints) & ~known_mask
+
+    table = default_table(deck)
+    lookup = deck_table(deck)
+    players = [table.walk(cards + board) for cards in [hole] + opponents]
+
+    strength = table.strength(players[0])
+    category = lookup.category(strength)
+    # Strength of the weakest hand of the next category up, so improving
+    # follows how the deck ranks its categories.
+    higher = bisect_right(lookup.bounds, strength)
+    higher = lookup.bounds[higher] if higher < len(lookup.bounds) else \
+        float('inf')
+
+    categories = {}
+    counts = {}
+    improving = leading = tying = 0
+    for index in mask_indices(unseen):
+        card = (INTS[index],)
+        strengths = [table.strength(player, card) for player in players]
+        hero = strengths[0]
+        best = max(strengths[1:], default=0)
+        bit = 1 << index
+        if hero > best:
+            leading |= bit
+        elif hero == best:
+            tying |= bit
+        categories[index] = lookup.category(hero)
+        if hero >= higher:
+            improving |= bit
+            counts[categories[index]] = counts.get(categories[index], 0) + 1
+    return Outs(category, unseen, categories, improving, leading, tying,
+                counts)
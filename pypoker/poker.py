@@ -1,5 +1,5 @@
-from pypoker.cards import CardsDeck, Player, Card, Table
-from pypoker.evaluator import Hand, Evaluator
+from pypoker.cards import CardsDeck, Player, Card, Table, card_index
+from pypoker.evaluator import Hand, Evaluator, Showdown
 
 
 
@@ -21,6 +21,8 @@ class TooManyCards(Exception):
 
 class PokerPlayer(Player):
 
+    __slots__ = ('_chips',)
+
     def __init__(self, name):
         super().__init__(name)
         self._chips = 0
@@ -51,10 +53,24 @@ class PokerPlayer(Player):
 
 class PokerTable(Table):
 
-    def __init__(self, max_players=10, min_players=2, cards_per_player=2,
-                 cards_per_table=5):
+    __slots__ = ('variant', 'min_players', 'cards_per_player',
+                 'cards_per_table', '_game_started')
 
-        super().__init__(max_players)
+    def __init__(self, max_players=10, min_players=2, cards_per_player=2,
+                 cards_per_table=5, rng=None, variant=None):
+        """
+        :param variant: a variants.Variant or its name; sets the number of
+                        cards dealt, the deck and how hands rank
+        """
+        self.variant = None
+        deck = None
+        if variant is not None:
+            from pypoker.variants import get_variant
+            self.variant = get_variant(variant)
+            cards_per_player = self.variant.hole_cards
+            cards_per_table = self.variant.board_cards
+            deck = self.variant.deck
+        super().__init__(max_players, rng, deck)
         self.min_players = min_players
         self.cards_per_player = cards_per_player
         self.cards_per_table = cards_per_table
@@ -76,8 +92,9 @@ class PokerTable(Table):
     def deal_cards(self):
         if not self.game_started:
             raise GameNotStarted()
-        self._deck = CardsDeck()
-        self.deck.shuffle()
+        self.deck.reset()
+        self.deck.shuffle(self.cards_per_player * len(self.players) +
+                          self.cards_per_table)
         for n in range(self.cards_per_player):
             for player in self.players:
                 if len(player.cards) >= self.cards_per_player:
@@ -90,10 +107,112 @@ class PokerTable(Table):
             card = self.deck.deal()
             self.receive_card(card)
 
+    def deal_batch(self, m, rng=None):
+        """
+        Deals m hands for the players sitting at the table in one call,
+        from the cards of the table's deck, without touching the players,
+        the board or the deck.
+
+        :param rng: numpy Generator or seed, drawn from the deck's rng when
+                    None so a seeded table replays its batches
+        :return: array of card indices, see pypoker.batch.deal
+        """
+        from pypoker import batch
+        if rng is None:
+            rng = self.deck.rng.getrandbits(64)
+        return batch.deal(m, len(self.players), self.cards_per_player,
+                          self.cards_per_table, rng,
+                          [card_index(card)
+                           for card in self.deck.definition.ints])
+
+    def board_state(self):
+        """
+        :return: statetable.BoardState of the cards dealt to the table
+        """
+        from pypoker.statetable import BoardState, default_table
+        return BoardState(self.cards, default_table(self.deck.definition))
+
+    def showdown(self, engine='state', cache=None):
+        """
+        Ranks the players still holding cards on their cards plus the board.
+        The 'state' engine, the default, walks the board once for every
+        player; 'norvig' misranks some 6 and 7-card hands. The
+        'board' engine looks the players up in the boards.BoardScores of a
+        complete board, from cache (a boards.BoardCache) or the shared
+        one. Tables of other variants than Hold'em rank hands by the
+        variant's rules, whatever the engine.
+
+        :return: Showdown of players, see Evaluator.showdown
+        """
+        players = [player for player in self.players if player.cards]
+        if self.variant is not None and not self.variant.standard:
+            result = Evaluator.rank(self.variant.showdown(
+                [player.cards for player in players], self.cards))
+        elif engine == 'board':
+            from pypoker.boards import default_cache
+            scores = (cache or default_cache()).get(self.cards)
+            result = scores.showdown([player.cards for player in players])
+        elif engine == 'state':
+            board = self.board_state()
+            result = Evaluator.rank([board.evaluate(player.cards)
+                                     for player in players])
+        else:
+            hands = [Hand(player.cards + self.cards, self.deck.definition)
+                     for player in players]
+            result = Evaluator.showdown(hands, engine, cache)
+        ordering = [[players[index] for index in group]
+                    for group in result.ordering]
+        return Showdown(ordering[0] if ordering else [],
+                        [group for group in ordering if len(group) > 1],
+                        ordering)
+
+    def _seat_results(self, results):
+        """
+        :param results: an EquityResult per player still holding cards
+        :return: an EquityResult per player at the table, all zero for the
+                 players who folded
+        """
+        from pypoker.equity import EquityResult
+        results = iter(results)
+        return [next(results) if player.cards else
+                EquityResult(0.0, 0.0, 0.0, 0.0) for player in self.players]
+
+    def equity(self, trials=100000, processes=None, seed=None):
+        """
+        Players who folded are left out of the hand and get an EquityResult
+        of zeros.
+
+        :return: an EquityResult per player for the cards dealt so far,
+                 see pypoker.equity.equity
+        """
+        if self.variant is not None and not self.variant.standard:
+            raise ValueError('Equity is only available for Hold\'em.')
+        from pypoker.equity import equity
+        return self._seat_results(equity(
+            [player.cards for player in self.players if player.cards],
+            self.cards, trials=trials, processes=processes, seed=seed))
+
+    def adaptive_equity(self, target_stderr=0.001, max_trials=1000000,
+                        seed=None):
+        """
+        :return: SimulationResult of the cards dealt so far, sampling until
+                 the standard error is at most target_stderr, see
+                 pypoker.equity.adaptive_equity; players who folded get an
+                 EquityResult of zeros
+        """
+        if self.variant is not None and not self.variant.standard:
+            raise ValueError('Equity is only available for Hold\'em.')
+        from pypoker.equity import SimulationResult, adaptive_equity
+        results, trials = adaptive_equity(
+            [player.cards for player in self.players if player.cards],
+            self.cards, target_stderr=target_stderr, max_trials=max_trials,
+            seed=seed)
+        return SimulationResult(self._seat_results(results), trials)
+
 # class Game:
 
 
-def test_play(num_players=2):
+def test_play(num_players=2, engine='norvig'):
     table = PokerTable()
     players = [PokerPlayer(str(n)) for n in range(num_players)]
     #     PokerPlayer('p1'),
@@ -126,25 +245,22 @@ def test_play(num_players=2):
     #    print('cards: ', p)
     #print()
     hands = [Hand(cards) for cards in player_cards]
-    best_hand = Evaluator.best_hand(hands)
+    best_hand = Evaluator.best_hand(hands, engine)
     #print('Best Card: ', str(best_hand))
-    ev =  Evaluator(best_hand[0]).hand_value()
+    ev =  Evaluator(best_hand[0], engine).hand_value()
     #print('Hand Value: ', values[ev.value])
     return values[ev.value]
 
 if __name__ == '__main__':
-    from collections import Counter
+    from pypoker import frequencies
     import timeit
-    results = []
-    num_trials = 100000
     start_time = timeit.default_timer()
-    for i in range(num_trials):
-        results.append(test_play(5))
-    counter = Counter(results)
-    #print(counter)
+    # Exact frequencies of every 7-card hand instead of sampled deals.
+    counter = frequencies.frequencies()
+    num_hands = sum(counter.values())
     print(timeit.default_timer() - start_time)
     for k,v in counter.items():
-        print(k, ' : ', 100 * v/num_trials, '%')
+        print(frequencies.NAMES[k], ' : ', 100 * v/num_hands, '%')
 
 
 
@@ -0,0 +1,322 @@
+"""
+Hand ranges and range-vs-range equity.
+
+A range is written as a comma separated list of hands, each optionally
+followed by :weight (1 when omitted):
+
+    AA          a pair                          6 combos
+    AKs AKo AK  suited, offsuit, both           4, 12, 16 combos
+    QQ+         QQ, KK and AA
+    ATs+        ATs, AJs, AQs and AKs
+    22-55       22, 33, 44 and 55
+    T9s-76s     T9s, 98s, 87s and 76s
+    A2s-A5s     A2s, A3s, A4s and A5s
+    AhKd        a single combo
+
+Ranges are stored as {combo index: weight}, where the combo index is the
+position of the two card indices (see cards.card_index) in COMBOS.
+"""
+
+
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+from math import sqrt
+
+from pypoker.cards import INTS, RANKS, card_index, pack_cards
+from pypoker.equity import EquityResult, BOARD_SIZE
+from pypoker.rng import SeededRNG
+from pypoker.statetable import default_table
+
+
+# Every pair of card indices, lowest first, and its position in COMBOS.
+COMBOS = tuple(combinations(range(52), 2))
+COMBO_INDEX = {combo: index for index, combo in enumerate(COMBOS)}
+
+_SUITS = 'sdch'
+
+
+def combo_index(first, second):
+    """
+    :return: index in COMBOS of two card indices, in any order
+    """
+    return COMBO_INDEX[min(first, second), max(first, second)]
+
+
+def _rank(char):
+    rank = RANKS.find(char.upper())
+    if rank < 0 or not char:
+        raise ValueError('Invalid rank: {}'.format(char))
+    return rank
+
+
+def _hand(text):
+    """
+    :return: (high rank, low rank, kind), kind is 'p' for pairs, 's', 'o'
+             or '' for both
+    """
+    if len(text) not in (2, 3) or (len(text) == 3 and text[2] not in 'so'):
+        raise ValueError('Invalid hand: {}'.format(text))
+    high, low = sorted((_rank(text[0]), _rank(text[1])), reverse=True)
+    if high == low:
+        if len(text) == 3:
+            raise ValueError('Invalid hand: {}'.format(text))
+        return high, low, 'p'
+    return high, low, text[2:]
+
+
+def _combos(high, low, kind):
+    combos = []
+    for first in range(4):
+        for second in range(4):
+            if kind == 'p' and first >= second:
+                continue
+            if kind == 's' and first != second:
+                continue
+            if kind == 'o' and first == second:
+                continue
+            combos.append(combo_index(first * 13 + high, second * 13 + low))
+    return combos
+
+
+def _expand(token):
+    """
+    :return: (high, low, kind) of every hand in a range token
+    """
+    if token.endswith('+'):
+        high, low, kind = _hand(token[:-1])
+        if kind == 'p':
+            return [(rank, rank, kind) for rank in range(low, 13)]
+        return [(high, rank, kind) for rank in range(low, high)]
+    if '-' in token:
+        first, last = (_hand(text) for text in token.split('-', 1))
+        if first[2] != last[2]:
+            raise ValueError('Invalid range: {}'.format(token))
+        first, last = max(first, last), min(first, last)
+        kind = first[2]
+        if kind == 'p':
+            return [(rank, rank, kind) for rank in range(last[0], first[0] + 1)]
+        if first[0] == last[0]:
+            return [(first[0], rank, kind)
+                    for rank in range(last[1], first[1] + 1)]
+        if first[0] - first[1] == last[0] - last[1]:
+            gap = first[0] - first[1]
+            return [(rank, rank - gap, kind)
+                    for rank in range(last[0], first[0] + 1)]
+        raise ValueError('Invalid range: {}'.format(token))
+    return [_hand(token)]
+
+
+def parse_range(text):
+    """
+    :return: {combo index: weight} for a range in the notation of the module
+             docstring
+    """
+    weights = {}
+    for token in text.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        weight = 1.0
+        if ':' in token:
+            token, weight = token.split(':', 1)
+            weight = float(weight)
+            if weight < 0:
+                raise ValueError('Weights cannot be negative.')
+        token = token.strip()
+        if len(token) == 4 and token[1] in _SUITS and token[3] in _SUITS:
+            cards = [_SUITS.index(token[n + 1]) * 13 + _rank(token[n])
+                     for n in (0, 2)]
+            if cards[0] == cards[1]:
+                raise ValueError('Invalid combo: {}'.format(token))
+            combos = [combo_index(*cards)]
+        else:
+            combos = [combo for hand in _expand(token)
+                      for combo in _combos(*hand)]
+        for combo in combos:
+            weights[combo] = weight
+    return {combo: weight for combo, weight in weights.items() if weight}
+
+
+class Range:
+
+    """ Weighted set of hole-card combos. """
+
+    def __init__(self, text='', weights=None):
+        self.weights = parse_range(text) if weights is None else dict(weights)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __iter__(self):
+        return iter(sorted(self.weights.items()))
+
+    def __contains__(self, combo):
+        return combo in self.weights
+
+    def combos(self):
+        """
+        :return: the combos as pairs of card indices
+        """
+        return [COMBOS[combo] for combo in sorted(self.weights)]
+
+    def remove(self, cards):
+        """
+        :return: a new Range without the combos holding any of cards, given
+                 as Cards, packed cards or card indices
+        """
+        dead = {card_index(card) for card in cards}
+        return Range(weights={
+            combo: weight for combo, weight in self.weights.items()
+            if COMBOS[combo][0] not in dead and COMBOS[combo][1] not in dead})
+
+
+def combo_strengths(table, board, combos):
+    """
+    :param table: statetable.StateTable
+    :param board: 5 packed cards
+    :param combos: combo indices, none holding a board card
+    :return: the strength of every combo with the board, walking the board
+             once and adding 2 cards per combo
+    """
+    walk = table.walk(board)
+    return [table.strength(walk, (INTS[COMBOS[combo][0]],
+                                  INTS[COMBOS[combo][1]]))
+            for combo in combos]
+
+
+class _Cumulative:
+
+    """ Total weight of the hands below or equal to a strength. """
+
+    def __init__(self, entries):
+        entries.sort()
+        self.keys = [strength for strength, _ in entries]
+        self.prefix = [0.0]
+        for _, weight in entries:
+            self.prefix.append(self.prefix[-1] + weight)
+
+    def counts(self, strength):
+        """
+        :return: (weight below strength, weight equal, total weight)
+        """
+        below = self.prefix[bisect_left(self.keys, strength)]
+        return (below, self.prefix[bisect_right(self.keys, strength)] - below,
+                self.prefix[-1])
+
+
+_EMPTY = _Cumulative([])
+
+
+def _score_board(table, board, hero, villain, cache=None):
+    """
+    Scores every compatible pair of hero and villain combos on one board.
+    A villain combo sharing a card with a hero combo is excluded by
+    subtracting the villain weight holding each hero card.
+
+    :param cache: boards.BoardCache to look the strengths up in
+    :return: (hero win weight, tie weight, total pair weight)
+    """
+    dead = {card_index(card) for card in board}
+    hero = [(combo, weight) for combo, weight in hero
+            if not dead.intersection(COMBOS[combo])]
+    villain = [(combo, weight) for combo, weight in villain
+               if not dead.intersection(COMBOS[combo])]
+    if not hero or not villain:
+        return 0.0, 0.0, 0.0
+    if cache is None:
+        strengths = combo_strengths(table, board,
+                                    [combo for combo, _ in hero + villain])
+    else:
+        scores = cache.get(board).strengths
+        strengths = [scores[combo] for combo, _ in hero + villain]
+    villain_strengths = strengths[len(hero):]
+    everyone = _Cumulative(list(zip(villain_strengths,
+                                    [weight for _, weight in villain])))
+    by_card = {}
+    same = {}
+    for (combo, weight), strength in zip(villain, villain_strengths):
+        same[combo] = weight
+        for card in COMBOS[combo]:
+            by_card.setdefault(card, []).append((strength, weight))
+    by_card = {card: _Cumulative(entries) for card, entries in by_card.items()}
+
+    wins = ties = total = 0.0
+    for (combo, weight), strength in zip(hero, strengths):
+        first, second = COMBOS[combo]
+        below, equal, pairs = everyone.counts(strength)
+        for card in (first, second):
+            card_below, card_equal, card_pairs = \
+                by_card.get(card, _EMPTY).counts(strength)
+            below -= card_below
+            equal -= card_equal
+            pairs -= card_pairs
+        # The same combo was subtracted once per card; it ties the hero.
+        equal += same.get(combo, 0.0)
+        pairs += same.get(combo, 0.0)
+        wins += weight * below
+        ties += weight * equal
+        total += weight * pairs
+    return wins, ties, total
+
+
+def range_equity(hero, villain, board=(), dead=(), trials=None, seed=None,
+                 cache=None):
+    """
+    :param hero: Range or range notation
+    :param villain: Range or range notation
+    :param board: board cards already dealt, 0 to 5
+    :param dead: cards known to be out of the deck
+    :param trials: number of random board completions, None to enumerate
+                   every completion (slow before the flop)
+    :param seed: seed to reproduce a sampled run
+    :param cache: boards.BoardCache scoring the complete boards, worth it
+                  when the same boards come back across queries
+    :return: [hero EquityResult, villain EquityResult]; win, tie and equity
+             are averaged over every compatible pair of combos and board
+    """
+    board = pack_cards(board)
+    dead = pack_cards(dead)
+    if len(board) > BOARD_SIZE:
+        raise ValueError('The board has at most {} cards.'.format(BOARD_SIZE))
+    hero = hero if isinstance(hero, Range) else Range(hero)
+    villain = villain if isinstance(villain, Range) else Range(villain)
+    known = board + dead
+    hero = list(hero.remove(known))
+    villain = list(villain.remove(known))
+    deck = [card for card in INTS if card not in set(known)]
+    missing = BOARD_SIZE - len(board)
+
+    if trials is None:
+        boards = (board + list(cards)
+                  for cards in combinations(deck, missing))
+    else:
+        if not isinstance(trials, int) or trials <= 0:
+            raise ValueError('Only positive integers allowed.')
+        rng = SeededRNG(seed)
+        boards = (board + rng.sample(deck, missing) for _ in range(trials))
+
+    table = default_table()
+    wins = ties = total = 0.0
+    equities = []
+    for full_board in boards:
+        board_wins, board_ties, board_total = _score_board(
+            table, full_board, hero, villain, cache)
+        wins += board_wins
+        ties += board_ties
+        total += board_total
+        if board_total:
+            equities.append((board_wins + board_ties / 2) / board_total)
+    if not total:
+        raise ValueError('The ranges have no compatible combos.')
+
+    stderr = 0.0
+    if trials is not None and len(equities) > 1:
+        mean = sum(equities) / len(equities)
+        variance = sum((value - mean) ** 2 for value in equities) / \
+            (len(equities) - 1)
+        stderr = sqrt(variance / len(equities))
+    losses = total - wins - ties
+    return [EquityResult(wins / total, ties / total,
+                         (wins + ties / 2) / total, stderr),
+            EquityResult(losses / total, ties / total,
+                         (losses + ties / 2) / total, stderr)]
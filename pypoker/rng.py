@@ -0,0 +1,91 @@
+"""
+Random number generators used to shuffle decks.
+
+SecureRNG:  reads the OS entropy source. Use it for real-money tables; it
+            cannot be seeded or replayed.
+SeededRNG:  Mersenne Twister seeded from a root seed and a key. Fast and
+            reproducible: use it for simulations and to replay hands.
+            spawn() splits it into independent streams, one per worker,
+            table or chunk of work.
+
+Both expose randbelow(n), an unbiased int in [0, n), which is what
+CardsDeck.shuffle draws from.
+"""
+
+
+from hashlib import sha256
+import random
+
+
+def _randbelow(rng, n):
+    """
+    :return: an unbiased int in [0, n), drawing bit_length(n) random bits
+             until they are below n
+    """
+    if n <= 0:
+        raise ValueError('n must be positive.')
+    bits = n.bit_length()
+    value = rng.getrandbits(bits)
+    while value >= n:
+        value = rng.getrandbits(bits)
+    return value
+
+
+class SecureRNG(random.SystemRandom):
+
+    randbelow = _randbelow
+
+
+class SeededRNG(random.Random):
+
+    """ Seeded generator identified by (root_seed, key).
+
+    The generator is seeded with a SHA-256 digest of the root seed and the
+    key, so streams with different keys start from unrelated states of the
+    Mersenne Twister period. When no root seed is given one is drawn from
+    the OS, and kept in root_seed so the run can be replayed.
+    """
+
+    randbelow = _randbelow
+
+    def __init__(self, seed=None, key=()):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.root_seed = seed
+        self.key = tuple(key)
+        digest = sha256(repr((seed, self.key)).encode()).digest()
+        super().__init__(int.from_bytes(digest, 'big'))
+
+    def __reduce__(self):
+        return self.__class__, (self.root_seed, self.key), self.getstate()
+
+    def stream(self, n):
+        """
+        :return: the n-th independent stream split from this generator
+        """
+        return SeededRNG(self.root_seed, self.key + (n,))
+
+    def spawn(self, n):
+        """
+        :return: n independent streams split from this generator
+        """
+        return [self.stream(i) for i in range(n)]
+
+
+RNG_MODES = ('secure', 'fast')
+
+_secure = SecureRNG()
+
+
+def new_rng(mode='secure', seed=None):
+    """
+    :param mode: 'secure' for SecureRNG, 'fast' for SeededRNG
+    :param seed: root seed of a 'fast' generator
+    """
+    if mode == 'secure':
+        if seed is not None:
+            raise ValueError('A secure generator cannot be seeded.')
+        return _secure
+    if mode == 'fast':
+        return SeededRNG(seed)
+    raise ValueError('Unknown mode: {}'.format(mode))
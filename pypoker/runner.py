@@ -0,0 +1,254 @@
+"""
+Asyncio runner for many concurrent PokerTable games.
+
+Every player is driven by an agent, an async callable
+
+    async def agent(player, turn) -> int or None
+
+returning the chips to put in (0 to check) or None to fold. The amount is
+passed to PokerPlayer.bet, so an agent that bets less than it has to call,
+more chips than it holds, raises or does not answer within the timeout
+folds.
+
+Each table plays in its own task, so a slow agent only holds up its own
+table. Showdowns are queued on a ShowdownBatcher, which evaluates the hands
+of many tables in one call run in a process pool: evaluation is pure Python
+and holds the GIL, so a thread would still take the event loop's CPU.
+"""
+
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+
+from pypoker.cards import pack_cards
+from pypoker.poker import NotEnoughChips
+from pypoker.statetable import default_table
+from pypoker.variants import get_variant
+
+
+Turn = namedtuple('Turn', ['table', 'street', 'board', 'pot', 'to_call'])
+HandResult = namedtuple('HandResult', ['table', 'winners', 'pot', 'bets'])
+
+STREETS = ('preflop', 'flop', 'turn', 'river')
+
+
+def _strengths(batch):
+    """
+    :param batch: list of showdowns, each (packed hole cards of every
+                  player, packed board, variants.Variant or None for
+                  Hold'em)
+    :return: the strength of every player's hand, by the rules of the
+             variant, in the same layout
+    """
+    return [get_variant(variant or 'holdem').showdown(holes, board)
+            for holes, board, variant in batch]
+
+
+class ShowdownBatcher:
+
+    """ Collects showdowns and evaluates them in batches.
+
+    A batch is sent to the executor when batch_size showdowns are waiting
+    or max_delay seconds after the first one was queued, whichever comes
+    first. When executor is None, a ProcessPoolExecutor is started on the
+    first batch and shut down by close().
+    """
+
+    def __init__(self, batch_size=64, max_delay=0.001, executor=None):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.executor = executor
+        self.batches = 0
+        self._owned = executor is None
+        self._pending = []
+        self._timer = None
+
+    async def strengths(self, holes, board, variant=None):
+        """
+        :param holes: list with the hole cards of each player
+        :param board: the cards on the board
+        :param variant: variants.Variant ranking the hands, None for Hold'em
+        :return: the strength of each hand, higher is better
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((([pack_cards(cards) for cards in holes],
+                               pack_cards(board), variant), future))
+        if len(self._pending) >= self.batch_size:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        futures = [future for _, future in batch]
+        if self.executor is None:
+            # Load (or generate) the state table before forking so the
+            # workers share it.
+            default_table()
+            self.executor = ProcessPoolExecutor()
+        done = loop.run_in_executor(self.executor, _strengths,
+                                    [hands for hands, _ in batch])
+
+        def resolve(done):
+            error = done.exception()
+            for n, future in enumerate(futures):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[n])
+        done.add_done_callback(resolve)
+
+    def close(self):
+        """
+        Shuts down the process pool started by the batcher, if any.
+        """
+        if self._owned and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class TableManager:
+
+    """ Plays hands at many tables concurrently.
+
+    :param timeout: seconds an agent has to act before folding
+    :param history: optional history.HandHistoryWriter recording every hand
+
+    timeouts and errors count the agents folded for being too slow and for
+    raising an exception.
+    """
+
+    def __init__(self, timeout=1.0, batcher=None, history=None):
+        self.timeout = timeout
+        self._owned = batcher is None
+        self.batcher = batcher or ShowdownBatcher()
+        self.history = history
+        self.timeouts = 0
+        self.errors = 0
+        self._tables = []
+        self._agents = {}
+
+    @property
+    def tables(self):
+        return list(self._tables)
+
+    def add_table(self, table, agents):
+        """
+        :param agents: an agent per player, in the order of table.players
+        """
+        if len(agents) != len(table.players):
+            raise ValueError('One agent per player is required.')
+        self._tables.append(table)
+        for player, agent in zip(table.players, agents):
+            self._agents[id(player)] = agent
+
+    async def _act(self, player, turn):
+        try:
+            return await asyncio.wait_for(
+                self._agents[id(player)](player, turn), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        except Exception:
+            self.errors += 1
+            return None
+
+    async def _betting_round(self, table, street, bets, pot):
+        board = table.cards[:(0, 3, 4, 5)[street]]
+        active = [player for player in table.players if player.cards]
+        street_bets = {id(player): 0 for player in active}
+        highest = 0
+        pending = deque(active)
+        while pending and sum(1 for p in active if p.cards) > 1:
+            player = pending.popleft()
+            if not player.cards:
+                continue
+            to_call = highest - street_bets[id(player)]
+            amount = await self._act(player, Turn(
+                table, STREETS[street], board, pot + sum(street_bets.values()),
+                to_call))
+            if amount is None or amount < to_call:
+                player.fold()
+                continue
+            if amount:
+                try:
+                    player.bet(amount)
+                except (NotEnoughChips, TypeError):
+                    player.fold()
+                    continue
+                street_bets[id(player)] += amount
+                bets[table.players.index(player)] += amount
+            if street_bets[id(player)] > highest:
+                highest = street_bets[id(player)]
+                seat = active.index(player)
+                pending = deque(active[seat + 1:] + active[:seat])
+        return pot + sum(street_bets.values())
+
+    async def play_hand(self, table):
+        """
+        Deals a hand, runs the betting rounds, pays the pot and records the
+        hand to the history when there is one.
+
+        :return: HandResult with the winning players
+        """
+        for player in table.players:
+            player.return_cards()
+        table.return_cards()
+        table.deal_cards()
+        players = table.players
+        bets = [0] * len(players)
+        pot = 0
+        for street in range(len(STREETS)):
+            pot = await self._betting_round(table, street, bets, pot)
+        active = [player for player in players if player.cards]
+        if len(active) == 1:
+            winners = active
+        else:
+            strengths = await self.batcher.strengths(
+                [player.cards for player in active], table.cards,
+                table.variant)
+            best = max(strengths)
+            winners = [player for player, strength in zip(active, strengths)
+                       if strength == best]
+        if pot:
+            share, rest = divmod(pot, len(winners))
+            for n, player in enumerate(winners):
+                amount = share + (1 if n < rest else 0)
+                if amount:
+                    player.add_chips(amount)
+        if self.history is not None:
+            self.history.record(table, bets=bets,
+                                winners=[players.index(player)
+                                         for player in winners])
+        return HandResult(table, winners, pot, bets)
+
+    async def _play(self, table, hands):
+        return [await self.play_hand(table) for _ in range(hands)]
+
+    async def run(self, hands=1):
+        """
+        Plays hands hands at every table, all tables at once. The process
+        pool of a batcher created by the manager is shut down at the end.
+
+        :return: list with the HandResults of each table
+        """
+        # Load (or generate) the state tables before the executor uses them.
+        for table in self._tables:
+            default_table(table.deck.definition)
+        try:
+            return await asyncio.gather(*(self._play(table, hands)
+                                          for table in self._tables))
+        finally:
+            if self._owned:
+                self.batcher.close()
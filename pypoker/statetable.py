@@ -0,0 +1,338 @@
+"""
+7-card hand evaluator walking a precomputed state-transition table.
+
+Each state is the multiset of ranks seen so far. A state is a row of 14
+ints: the offsets of the 13 states reached by adding one more card of each
+rank, followed by the best non-flush strength of the state (for 5 or more
+cards). Evaluating a hand is one table lookup per card plus, when 5 or more
+cards share a suit, one lookup in the flush table.
+
+Strengths are the same as pypoker.lookup: 1 to 7462, higher is better.
+
+The table is generated once, saved to disk and memory-mapped when loaded,
+so every process evaluating hands on the machine shares the same pages.
+
+BoardState walks a shared board once, as it is dealt, and scores each
+player by adding only their hole cards.
+"""
+
+
+from array import array
+from itertools import combinations
+import mmap
+import os
+import struct
+
+from pypoker.cards import STANDARD, get_deck, pack_card, pack_cards
+from pypoker.lookup import deck_table
+
+
+ROW = 14
+MAX_CARDS = 7
+VERSION = 1
+
+_HEADER = struct.Struct('4sIII')
+_MAGIC = b'PKST'
+
+# Three bits per suit count, indexed by the suit bit of a packed card.
+SUIT_COUNT = (0, 1, 8, 0, 64, 0, 0, 0, 512)
+
+
+def _flush_suits():
+    """
+    :return: suit bits of the flushed suit (shifted to the packed card
+             position) for every sum of SUIT_COUNT, 0 if there is no flush
+    """
+    suits = [0] * 4096
+    for key in range(4096):
+        for n in range(4):
+            if (key >> (3 * n)) & 7 >= 5:
+                suits[key] = 1 << (12 + n)
+    return suits
+
+
+FLUSH_SUITS = _flush_suits()
+
+# Walk of no cards, see StateTable.walk.
+START = (0, 0, {})
+
+
+class StateTable:
+
+    """ Rank state-transition table plus best flush per rank bitmask.
+
+    table:   ROW ints per state, see the module docstring
+    flushes: rank bitmask -> best straight flush or flush strength
+    deck:    cards.DeckDefinition whose hands the strengths rank
+    """
+
+    def __init__(self, table, flushes, path=None, deck=None):
+        self.table = table
+        self.flushes = flushes
+        self.path = path
+        self.deck = get_deck(deck)
+
+    def __len__(self):
+        return len(self.table) // ROW
+
+    @classmethod
+    def generate(cls, deck=None):
+        """
+        :param deck: cards.DeckDefinition or its name; only states of the
+                     ranks in the deck are generated
+        :return: a new StateTable, computed from pypoker.lookup
+        """
+        deck = get_deck(deck)
+        lookup = deck_table(deck)
+        primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+        def best(ranks):
+            strength = 0
+            for combo in combinations(ranks, 5):
+                mask = 0
+                product = 1
+                for rank in combo:
+                    mask |= 1 << rank
+                    product *= primes[rank]
+                strength = max(strength, lookup.unique5[mask] or
+                               lookup.products.get(product, 0))
+            return strength
+
+        states = {(0,) * 13: 0}
+        level = [(0,) * 13]
+        for size in range(MAX_CARDS):
+            next_level = []
+            for state in level:
+                for rank in deck.indexes:
+                    if state[rank] == 4:
+                        continue
+                    new = state[:rank] + (state[rank] + 1,) + state[rank + 1:]
+                    if new not in states:
+                        states[new] = len(states)
+                        next_level.append(new)
+            level = next_level
+
+        table = array('i', bytes(4 * ROW * len(states)))
+        for state, n in states.items():
+            row = n * ROW
+            size = sum(state)
+            if size < MAX_CARDS:
+                for rank in deck.indexes:
+                    if state[rank] < 4:
+                        new = state[:rank] + (state[rank] + 1,) + \
+                              state[rank + 1:]
+                        table[row + rank] = states[new] * ROW
+            if size >= 5:
+                table[row + 13] = best([rank for rank in range(13)
+                                        for _ in range(state[rank])])
+
+        flushes = array('i', bytes(4 * 8192))
+        for mask in range(8192):
+            ranks = [rank for rank in range(13) if mask >> rank & 1]
+            if 5 <= len(ranks) <= MAX_CARDS:
+                flushes[mask] = max(
+                    lookup.flushes[sum(1 << rank for rank in combo)]
+                    for combo in combinations(ranks, 5))
+        return cls(table, flushes, deck=deck)
+
+    def save(self, path):
+        """
+        Writes the table to path, atomically replacing any existing file.
+        """
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, VERSION, len(self),
+                                    len(self.flushes)))
+            self.table.tofile(file)
+            self.flushes.tofile(file)
+        os.replace(tmp, path)
+        self.path = path
+
+    @classmethod
+    def load(cls, path, deck=None):
+        """
+        :param deck: the deck the table was generated for
+        :return: a StateTable reading a memory-mapped file written by save
+        """
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < _HEADER.size:
+            buffer.close()
+            raise ValueError('Invalid state table: {}'.format(path))
+        magic, version, rows, flushes = _HEADER.unpack_from(buffer)
+        size = _HEADER.size + 4 * (rows * ROW + flushes)
+        if magic != _MAGIC or version != VERSION or len(buffer) != size:
+            buffer.close()
+            raise ValueError('Invalid state table: {}'.format(path))
+        view = memoryview(buffer)[_HEADER.size:].cast('i')
+        return cls(view[:rows * ROW], view[rows * ROW:], path, deck)
+
+    def walk(self, cards, start=START):
+        """
+        Adds packed cards to a walk, a (state, suit counts, {suit bit: OR of
+        the cards of the suit}) tuple. Walk the cards shared by several
+        hands once, then score each hand with strength().
+
+        :param start: the walk to add the cards to, left untouched
+        :return: the new walk
+        """
+        table = self.table
+        state, suits, masks = start
+        masks = dict(masks)
+        for card in cards:
+            state = table[state + ((card >> 8) & 0xF)]
+            suits += SUIT_COUNT[(card >> 12) & 0xF]
+            masks[card & 0xF000] = masks.get(card & 0xF000, 0) | card
+        return state, suits, masks
+
+    def strength(self, walk, cards=()):
+        """
+        :param walk: see walk(), 5 to 7 cards with cards
+        :param cards: packed cards to add to the walk
+        :return: strength of the best 5-card hand of the walk plus cards
+        """
+        table = self.table
+        state, suits, masks = walk
+        for card in cards:
+            state = table[state + ((card >> 8) & 0xF)]
+            suits += SUIT_COUNT[(card >> 12) & 0xF]
+        suit = FLUSH_SUITS[suits]
+        if suit:
+            mask = masks.get(suit, 0)
+            for card in cards:
+                if card & suit:
+                    mask |= card
+            return self.flushes[mask >> 16]
+        return table[state + 13]
+
+    def evaluate(self, cards):
+        """
+        :return: strength of the best 5-card hand among 5 to 7 packed cards
+        """
+        if not 5 <= len(cards) <= MAX_CARDS:
+            raise ValueError('Between 5 and {} cards are required.'.format(
+                MAX_CARDS))
+        return self.strength(START, cards)
+
+
+STREETS = {0: 'preflop', 3: 'flop', 4: 'turn', 5: 'river'}
+BOARD_SIZE = 5
+
+
+class BoardState:
+
+    """ Board walked through a StateTable, one card at a time.
+
+    The shared board is walked once, as it is dealt; scoring a player then
+    only adds their hole cards to the board state. copy() branches the
+    state, e.g. to try every turn card from the same flop.
+    """
+
+    def __init__(self, board=(), table=None):
+        self.table = table or default_table()
+        self.cards = []
+        self._walk = START
+        self._counts = [0] * 13
+        for card in board:
+            self.add(card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    @property
+    def street(self):
+        """
+        :return: 'preflop', 'flop', 'turn', 'river', or None while a street
+                 is being dealt
+        """
+        return STREETS.get(len(self.cards))
+
+    def add(self, card):
+        """
+        :param card: Card, packed card or card index dealt to the board
+        """
+        card = pack_card(card)
+        if len(self.cards) >= BOARD_SIZE:
+            raise ValueError('The board has at most {} cards.'.format(
+                BOARD_SIZE))
+        if card in self.cards:
+            raise ValueError('Card already on the board: {}'.format(card))
+        self.cards.append(card)
+        self._walk = self.table.walk((card,), self._walk)
+        self._counts[(card >> 8) & 0xF] += 1
+
+    def copy(self):
+        board = BoardState.__new__(BoardState)
+        board.table = self.table
+        board.cards = list(self.cards)
+        board._walk = self._walk
+        board._counts = list(self._counts)
+        return board
+
+    def evaluate(self, hole):
+        """
+        :param hole: Cards, packed cards or card indices, 5 to 7 with the board
+        :return: strength of the best 5-card hand of hole plus the board
+        """
+        hole = pack_cards(hole)
+        if not 5 <= len(hole) + len(self.cards) <= MAX_CARDS:
+            raise ValueError('Between 5 and {} cards are required.'.format(
+                MAX_CARDS))
+        return self.table.strength(self._walk, hole)
+
+    def category(self, hole):
+        """
+        :return: category made by hole plus the board, 800 (Straight Flush)
+                 to 0 (High Card); with fewer than 5 cards only pairs, trips
+                 and quads count
+        """
+        hole = pack_cards(hole)
+        if len(hole) + len(self.cards) >= 5:
+            return deck_table(self.table.deck).category(self.evaluate(hole))
+        counts = list(self._counts)
+        for card in hole:
+            counts[(card >> 8) & 0xF] += 1
+        if 4 in counts:
+            return 700
+        if 3 in counts:
+            return 300
+        return 100 * min(counts.count(2), 2)
+
+
+def default_path(deck=None):
+    """
+    :return: where the shared state table of a deck is stored,
+             $PYPOKER_CACHE or ~/.cache/pypoker
+    """
+    deck = get_deck(deck)
+    directory = os.environ.get('PYPOKER_CACHE') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'pypoker')
+    name = 'states-v{}'.format(VERSION)
+    if deck != STANDARD:
+        # The file name holds everything the table depends on.
+        name += '-{}{}'.format(deck.ranks,
+                               '-fbfh' if deck.flush_beats_full_house else '')
+    return os.path.join(directory, name + '.bin')
+
+
+_tables = {}
+
+
+def default_table(deck=None):
+    """
+    :param deck: cards.DeckDefinition or its name, the standard deck when None
+    :return: the memory-mapped StateTable of deck at default_path(deck),
+             generating and saving it the first time it is needed on the
+             machine
+    """
+    deck = get_deck(deck)
+    if deck not in _tables:
+        path = default_path(deck)
+        try:
+            table = StateTable.load(path, deck)
+        except (OSError, ValueError):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            StateTable.generate(deck).save(path)
+            table = StateTable.load(path, deck)
+        _tables[deck] = table
+    return _tables[deck]
@@ -0,0 +1,171 @@
+"""
+Poker variants: how many hole and board cards are dealt, how many hole
+cards a hand must use, which ranks are in the deck and how hands rank.
+
+    holdem      2 hole cards, best 5 of the 7 cards
+    omaha       4 hole cards, exactly 2 of them with 3 of the 5 board cards
+    omaha5      5 hole cards, same rule
+    omaha6      6 hole cards, same rule
+    shortdeck   6 to ace only (36 cards), flush beats full house and
+                A-6-7-8-9 is a straight
+
+Hands are scored with the tables of the variant's deck (see
+cards.DeckDefinition), which set how hands rank. The
+combinations a hand may be made of are enumerated once, as tuples of card
+positions (HOLE_PAIRS, BOARD_TRIPLES, FIVES), and for Omaha the board side
+of every combination (prime product, rank bitmask and common suit of the
+3 board cards) is computed once per board and shared by every player.
+"""
+
+
+from itertools import combinations
+
+from pypoker.cards import STANDARD, get_deck, pack_cards
+from pypoker.lookup import deck_table
+from pypoker.statetable import BoardState, default_table as state_table
+
+
+# Positions of the cards of every combination, by number of cards.
+HOLE_PAIRS = {n: tuple(combinations(range(n), 2)) for n in range(2, 7)}
+BOARD_TRIPLES = {n: tuple(combinations(range(n), 3)) for n in range(3, 6)}
+FIVES = {n: tuple(combinations(range(n), 5)) for n in range(5, 8)}
+
+
+def board_partials(board):
+    """
+    :param board: 3 to 5 packed cards
+    :return: (prime product, OR of the cards, common suit bit or 0) of every
+             3-card combination of the board
+    """
+    partials = []
+    for i, j, k in BOARD_TRIPLES[len(board)]:
+        a, b, c = board[i], board[j], board[k]
+        partials.append(((a & 0xFF) * (b & 0xFF) * (c & 0xFF), a | b | c,
+                         a & b & c & 0xF000))
+    return partials
+
+
+class Variant:
+
+    """ Rules of a poker variant.
+
+    hole_used is the number of hole cards a hand must use with
+    5 - hole_used board cards, None when any 5 cards make a hand. deck is
+    a cards.DeckDefinition or its name, the standard deck by default.
+    """
+
+    def __init__(self, name, hole_cards, board_cards=5, hole_used=None,
+                 deck=None):
+        self.name = name
+        self.hole_cards = hole_cards
+        self.board_cards = board_cards
+        self.hole_used = hole_used
+        self.deck = get_deck(deck)
+
+    def __repr__(self):
+        return 'Variant({!r})'.format(self.name)
+
+    @property
+    def standard(self):
+        """
+        True for Hold'em with a standard deck
+        """
+        return self.hole_used is None and self.deck == STANDARD
+
+    @property
+    def table(self):
+        """
+        :return: the LookupTable ranking hands under these rules
+        """
+        return deck_table(self.deck)
+
+    def evaluate(self, hole, board):
+        """
+        :param hole: Cards, packed cards or card indices of a player
+        :param board: cards on the board, 5 with hole_used
+        :return: strength of the best hand allowed by the rules
+        """
+        return self.showdown([hole], board)[0]
+
+    def showdown(self, holes, board):
+        """
+        Scores every player against the same board, sharing the work done
+        on the board.
+
+        :return: strength of each player's hand, higher is better
+        """
+        holes = [pack_cards(hole) for hole in holes]
+        board = pack_cards(board)
+        if self.hole_used == 2:
+            if len(board) < 3:
+                raise ValueError('At least 3 board cards are required.')
+            if any(len(hole) not in HOLE_PAIRS for hole in holes):
+                raise ValueError('Between {} and {} hole cards are '
+                                 'required.'.format(min(HOLE_PAIRS),
+                                                    max(HOLE_PAIRS)))
+            partials = board_partials(board)
+            return [self._omaha(hole, partials) for hole in holes]
+        if self.hole_used is not None:
+            raise ValueError('Unsupported number of hole cards used.')
+        if len(board) >= 3:
+            state = BoardState(board, state_table(self.deck))
+            return [state.evaluate(hole) for hole in holes]
+        evaluate = self.table.evaluate
+        strengths = []
+        for hole in holes:
+            cards = hole + board
+            if len(cards) not in FIVES:
+                raise ValueError('Between 5 and 7 cards are required.')
+            strengths.append(max(
+                evaluate([cards[n] for n in five])
+                for five in FIVES[len(cards)]))
+        return strengths
+
+    def _omaha(self, hole, partials):
+        table = self.table
+        flushes = table.flushes
+        unique5 = table.unique5
+        products = table.products
+        best = 0
+        for i, j in HOLE_PAIRS[len(hole)]:
+            a, b = hole[i], hole[j]
+            product = (a & 0xFF) * (b & 0xFF)
+            cards = a | b
+            suit = a & b & 0xF000
+            for board_product, board_cards, board_suit in partials:
+                mask = (cards | board_cards) >> 16
+                if suit & board_suit:
+                    strength = flushes[mask]
+                else:
+                    strength = unique5[mask] or \
+                        products[product * board_product]
+                if strength > best:
+                    best = strength
+        return best
+
+    def category(self, strength):
+        """
+        :return: category of a strength, 800 (Straight Flush) to 0 (High Card)
+        """
+        return self.table.category(strength)
+
+
+VARIANTS = {
+    'holdem': Variant('holdem', 2),
+    'omaha': Variant('omaha', 4, hole_used=2),
+    'omaha5': Variant('omaha5', 5, hole_used=2),
+    'omaha6': Variant('omaha6', 6, hole_used=2),
+    'shortdeck': Variant('shortdeck', 2, deck='shortdeck'),
+}
+
+
+def get_variant(variant):
+    """
+    :param variant: a Variant or the name of one in VARIANTS
+    """
+    if isinstance(variant, Variant):
+        return variant
+    try:
+        return VARIANTS[variant]
+    except KeyError:
+        raise ValueError('Unknown variant: {}'.format(variant)) from None
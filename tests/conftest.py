@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def cache(tmp_path_factory):
+    """
+    Keeps the state and preflop tables generated by the tests out of the
+    real cache directory.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('PYPOKER_CACHE',
+                           str(tmp_path_factory.mktemp('cache')))
+        yield
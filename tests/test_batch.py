@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from pypoker import batch
+from pypoker.cards import *
+from pypoker.evaluator import *
+from pypoker.statetable import default_table
+
+
+class TestEvaluate:
+
+    def setup_class(self):
+        rng = random.Random(2)
+        self.hands = {n: [rng.sample(range(52), n) for _ in range(5000)]
+                      for n in (5, 6, 7)}
+        self.table = default_table()
+
+    def test_evaluate(self):
+        for n, hands in self.hands.items():
+            strengths, categories = batch.evaluate(np.array(hands))
+            assert strengths.shape == categories.shape == (len(hands),)
+            for hand, strength, category in zip(hands, strengths,
+                                                categories):
+                cards = [INTS[index] for index in hand]
+                assert strength == self.table.evaluate(cards)
+                ev = Evaluator(Hand(cards), 'state')
+                assert category == ev.hand_value().value
+
+    def test_as_array(self):
+        deck = CardsDeck()
+        hands = [deck[8:13], deck[0:52:13] + [deck[1]]]
+        strengths, categories = batch.evaluate(batch.as_array(hands))
+        assert list(strengths) == [7462, 7297]
+        assert list(categories) == [800, 700]
+        assert batch.as_array(hands).tolist() == batch.as_array(
+            [[encode(card) for card in hand] for hand in hands]).tolist()
+
+    def test_empty(self):
+        strengths, categories = batch.evaluate(np.zeros((0, 7), dtype=int))
+        assert len(strengths) == len(categories) == 0
+
+    def test_shape_exception(self):
+        with pytest.raises(ValueError):
+            batch.evaluate(np.zeros((3, 4), dtype=int))
+        with pytest.raises(ValueError):
+            batch.evaluate(np.zeros(7, dtype=int))
+
+    def test_value_exception(self):
+        with pytest.raises(ValueError):
+            batch.evaluate(np.array([[0, 1, 2, 3, 52]]))
+        with pytest.raises(TypeError):
+            batch.evaluate(np.array([[0.0, 1, 2, 3, 4]]))
+
+
+class TestDeal:
+
+    def test_deal(self):
+        deals = batch.deal(2000, 4, rng=5)
+        assert deals.shape == (2000, 13)
+        assert deals.dtype == np.uint8
+        assert deals.max() <= 51
+        assert all(len(set(row)) == 13 for row in deals.tolist())
+
+    def test_seed(self):
+        assert (batch.deal(10, 2, rng=1) == batch.deal(10, 2, rng=1)).all()
+        assert (batch.deal(10, 2, rng=1) != batch.deal(10, 2, rng=2)).any()
+
+    def test_uniform(self):
+        counts = np.bincount(batch.deal(52000, 1, 1, 0, rng=3).ravel(),
+                             minlength=52)
+        assert counts.min() > 800 and counts.max() < 1200
+        positions = np.bincount(batch.deal(52000, 1, 2, 0, rng=4)[:, 1],
+                                minlength=52)
+        assert positions.min() > 800 and positions.max() < 1200
+
+    def test_size_exception(self):
+        with pytest.raises(ValueError):
+            batch.deal(1, 24)
+
+    def test_seat_hands(self):
+        deals = np.arange(9)[None, :]
+        hands = batch.seat_hands(deals, 2)
+        assert hands.tolist() == [[[0, 1, 4, 5, 6, 7, 8],
+                                   [2, 3, 4, 5, 6, 7, 8]]]
+
+    def test_showdown(self):
+        deals = batch.deal(200, 3, rng=6)
+        strengths = batch.showdown(deals, 3)
+        table = default_table()
+        for deal, row in zip(deals.tolist(), strengths.tolist()):
+            board = [INTS[index] for index in deal[6:]]
+            for seat in range(3):
+                hole = [INTS[index] for index in deal[2 * seat:2 * seat + 2]]
+                assert row[seat] == table.evaluate(hole + board)
+
+    def test_table_deal_batch(self):
+        from pypoker.poker import PokerTable, PokerPlayer
+        table = PokerTable(cards_per_player=4)
+        for n in range(3):
+            table.sit_player(PokerPlayer(str(n)))
+        assert table.deal_batch(5, rng=0).shape == (5, 17)
+
+    def test_table_deal_batch_seed(self):
+        from pypoker.poker import PokerTable, PokerPlayer
+        from pypoker.rng import SeededRNG
+        deals = []
+        for n in range(2):
+            table = PokerTable(rng=SeededRNG(7))
+            for n in range(3):
+                table.sit_player(PokerPlayer(str(n)))
+            deals.append(table.deal_batch(10))
+        assert (deals[0] == deals[1]).all()
+        assert (table.deal_batch(10) != deals[1]).any()
+
+    def test_table_deal_batch_short_deck(self):
+        from pypoker.poker import PokerTable, PokerPlayer
+        table = PokerTable(variant='shortdeck')
+        for n in range(3):
+            table.sit_player(PokerPlayer(str(n)))
+        deals = table.deal_batch(500, rng=1)
+        assert deals.shape == (500, 11)
+        assert (deals % 13 >= 4).all()
+
+    def test_deal_cards(self):
+        deals = batch.deal(100, 2, cards=range(10, 20), rng=2)
+        assert deals.min() >= 10 and deals.max() < 20
+        with pytest.raises(ValueError):
+            batch.deal(1, 5, cards=range(10))
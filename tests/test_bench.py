@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from pypoker import bench
+from pypoker.evaluator import Hand, Evaluator
+
+
+class TestBench:
+
+    def test_category_hands(self):
+        values = [Evaluator(Hand(bench.cards(hand)), 'state').hand_value().value
+                  for hand in bench.CATEGORY_HANDS.values()]
+        assert values == [800, 700, 600, 500, 400, 300, 200, 100, 0]
+
+    def test_benchmarks(self):
+        for name, setup in bench.BENCHMARKS.items():
+            setup()()
+
+    def test_run(self):
+        results = bench.run(['deck.deal', 'hand.construction'],
+                            min_time=0.01, repeat=2)
+        assert set(results) == {'deck.deal', 'hand.construction'}
+        assert all(value > 0 for value in results.values())
+        assert bench.run([]) == {}
+
+    def test_compare(self):
+        baseline = {'a': 100.0, 'b': 100.0, 'c': 100.0}
+        results = {'a': 95.0, 'b': 50.0, 'c': 80.0, 'd': 1.0}
+        regressions = bench.compare(baseline, results, 0.1)
+        assert [regression.name for regression in regressions] == ['b', 'c']
+        assert regressions[0] == bench.Regression('b', 100.0, 50.0, -0.5)
+        assert regressions[1].change == pytest.approx(-0.2)
+        assert bench.compare(baseline, results, 0.6) == []
+
+    def test_save_load(self, tmp_path):
+        path = str(tmp_path / 'baseline.json')
+        bench.save({'a': 1.5}, path)
+        assert bench.load(path) == {'a': 1.5}
+        assert 'python' in json.load(open(path))
+
+    def test_main(self, tmp_path, capsys):
+        path = str(tmp_path / 'baseline.json')
+        args = ['--filter', 'deck.deal', '--min-time', '0.01']
+        assert bench.main(args + ['--save', path]) == 0
+        assert 'deck.deal' in capsys.readouterr().out
+        bench.save({'deck.deal': 1e12}, path)
+        assert bench.main(args + ['--compare', path]) == 1
+        assert 'REGRESSION deck.deal' in capsys.readouterr().out
+
+    def test_table_memory(self):
+        small = bench.table_memory(tables=50, players=2)
+        large = bench.table_memory(tables=50, players=10)
+        assert 0 < small < large
+
+    def test_main_memory(self, capsys):
+        assert bench.main(['--memory']) == 0
+        assert 'bytes/table' in capsys.readouterr().out
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from pypoker.boards import BoardCache, BoardScores
+from pypoker.cards import *
+from pypoker.evaluator import Evaluator
+from pypoker.ranges import COMBOS, range_equity
+from pypoker.statetable import BoardState
+
+
+def cards(text):
+    return [INTS['sdch'.index(card[1]) * 13 + RANKS.index(card[0])]
+            for card in text.split()]
+
+
+class TestBoardScores:
+
+    def setup_class(self):
+        self.board = cards('2s 7d 9c Jh Kh')
+        self.scores = BoardScores(self.board)
+
+    def test_strengths(self):
+        state = BoardState(self.board)
+        dead = card_mask(self.board)
+        for combo, (first, second) in enumerate(COMBOS):
+            if dead & (1 << first | 1 << second):
+                assert self.scores.strengths[combo] == 0
+            else:
+                assert self.scores.strengths[combo] == state.evaluate(
+                    [INTS[first], INTS[second]])
+
+    def test_sorted(self):
+        assert len(self.scores) == 1081
+        assert list(self.scores.sorted) == sorted(self.scores.sorted)
+        assert 0 not in self.scores.sorted
+
+    def test_strength(self):
+        hole = cards('Ah Qh')
+        expected = BoardState(self.board).evaluate(hole)
+        assert self.scores.strength(hole) == expected
+        assert self.scores.strength([decode(card) for card in hole]) == \
+            expected
+        assert self.scores.strength([card_index(card) for card in hole]) \
+            == expected
+        assert self.scores.strength(cards('2s 3s')) == 0
+
+    def test_counts(self):
+        # Top set: the three combos of kings tie.
+        strength = self.scores.strength(cards('Kd Ks'))
+        below, equal = self.scores.counts(strength)
+        assert equal == 3
+        assert below + equal + sum(
+            1 for value in self.scores.sorted if value > strength) == 1081
+
+    def test_showdown(self):
+        holes = [cards('Ah Qh'), cards('Kd Ks'), cards('Ac Qd'),
+                 cards('3c 4c')]
+        state = BoardState(self.board)
+        assert self.scores.showdown(holes) == Evaluator.rank(
+            [state.evaluate(hole) for hole in holes])
+
+    def test_exception(self):
+        with pytest.raises(ValueError):
+            BoardScores(self.board[:4])
+
+
+class TestBoardCache:
+
+    def test_lru(self):
+        cache = BoardCache(maxsize=2)
+        first, second, third = (cards(text) for text in (
+            '2s 7d 9c Jh Kh', '2s 7d 9c Jh Ah', '3s 7d 9c Jh Kh'))
+        scores = cache.get(first)
+        assert cache.get(list(reversed(first))) is scores
+        cache.get(second)
+        cache.get(first)
+        cache.get(third)
+        assert len(cache) == 2
+        assert tuple(cache.info()) == (2, 3, 2, 2)
+        assert cache.get(first) is scores
+        cache.get(second)
+        assert cache.info().misses == 4
+        cache.clear()
+        assert tuple(cache.info()) == (0, 0, 2, 0)
+
+    def test_maxsize_exception(self):
+        with pytest.raises(ValueError):
+            BoardCache(0)
+
+    def test_range_equity(self):
+        cache = BoardCache()
+        rng = random.Random(5)
+        for n in range(5):
+            board = rng.sample(INTS, 5)
+            expected = range_equity('22+,AT+,KQs', 'QQ+,AK', board)
+            assert range_equity('22+,AT+,KQs', 'QQ+,AK', board,
+                                cache=cache) == expected
+        assert range_equity('TT+', 'AK', cards('2s 7d 9c Jh'),
+                            cache=cache) == \
+            range_equity('TT+', 'AK', cards('2s 7d 9c Jh'))
+        # One board per river card.
+        assert cache.info().misses == 5 + 48
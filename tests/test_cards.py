@@ -1,5 +1,6 @@
 import pytest
 from pypoker import cards
+from pypoker.rng import SeededRNG
 
 
 class TestCardsDeck:
@@ -37,6 +38,158 @@ class TestCardsDeck:
     def test_str(self):
         assert str(self.deck)
 
+    def test_getitem_negative(self):
+        deck = cards.CardsDeck()
+        deck.deal()
+        assert deck[-1] == cards.Card('A', 'hearts')
+        assert deck[0] == cards.Card('3', 'spades')
+        assert deck[:2] == [cards.Card('3', 'spades'), cards.Card('4', 'spades')]
+
+    def test_setitem(self):
+        deck = cards.CardsDeck()
+        deck.deal()
+        deck[0] = deck[1]
+        assert deck[0] == cards.Card('4', 'spades')
+        deck[:2] = [cards.Card('A', 'spades')] * 2
+        assert deck[:3] == [cards.Card('A', 'spades')] * 2 + [
+            cards.Card('5', 'spades')]
+
+    def test_storage(self):
+        deck = cards.CardsDeck()
+        assert not hasattr(deck, '__dict__')
+        assert isinstance(deck._deck, bytearray)
+        with pytest.raises(ValueError):
+            deck[0] = 'not a card'
+
+    def test_deal_all(self):
+        deck = cards.CardsDeck()
+        dealt = [deck.deal() for _ in range(52)]
+        assert sorted(dealt) == sorted(cards.CardsDeck())
+        with pytest.raises(IndexError):
+            deck.deal()
+
+    def test_reset(self):
+        deck = cards.CardsDeck()
+        storage = deck._deck
+        deck.shuffle()
+        first = [deck.deal() for _ in range(5)]
+        deck.reset()
+        assert len(deck) == 52
+        assert deck._deck is storage
+        assert [deck.deal() for _ in range(5)] == first
+
+    def test_partial_shuffle(self):
+        fresh = list(cards.CardsDeck())
+        deck = cards.CardsDeck(rng=SeededRNG(5))
+        deck.shuffle(3)
+        full = cards.CardsDeck(rng=SeededRNG(5))
+        full.shuffle()
+        # The first 3 draws of a full shuffle; at most 3 swaps below them.
+        assert deck[:3] == full[:3]
+        assert deck[:3] != fresh[:3]
+        assert sum(1 for a, b in zip(deck[3:], fresh[3:]) if a != b) <= 3
+        assert sorted(deck) == sorted(fresh)
+        deck = cards.CardsDeck()
+        deck.shuffle(0)
+        assert list(deck) == list(cards.CardsDeck())
+
+    def test_remove(self):
+        deck = cards.CardsDeck()
+        dead = [cards.Card('A', 'spades'), cards.Card('2', 'hearts')]
+        deck.remove(dead)
+        assert len(deck) == 50
+        deck.shuffle()
+        assert not set(dead) & set(deck.deal() for _ in range(50))
+        with pytest.raises(ValueError):
+            deck.remove(dead[:1])
+
+    def test_encoded_deck(self):
+        deck = cards.CardsDeck(encoded=True)
+        assert len(deck) == 52
+        assert [cards.decode(card) for card in deck] == list(cards.CardsDeck())
+
+
+class TestEncoding:
+
+    def test_round_trip(self):
+        for card in cards.CardsDeck():
+            assert cards.decode(cards.encode(card)) == card
+
+    def test_layout(self):
+        value = cards.encode(cards.Card('K', 'clubs'))
+        assert value == 0x08004B25
+        assert cards.card_rank(value) == 13
+        assert cards.card_suit(value) == 0b0100
+
+    def test_card_index(self):
+        for index, card in enumerate(cards.CardsDeck()):
+            assert cards.card_index(card) == index
+            assert cards.card_index(cards.encode(card)) == index
+
+    def test_card_mask(self):
+        deck = list(cards.CardsDeck())
+        mask = cards.card_mask([deck[0], cards.encode(deck[13]), 51])
+        assert mask == 1 | 1 << 13 | 1 << 51
+        assert cards.mask_indices(mask) == [0, 13, 51]
+        assert cards.card_mask(deck) == cards.FULL_MASK
+        assert cards.mask_indices(0) == []
+
+    def test_pack_card(self):
+        for index, card in enumerate(cards.CardsDeck()):
+            value = cards.encode(card)
+            assert cards.pack_card(card) == value
+            assert cards.pack_card(value) == value
+            assert cards.pack_card(index) == value
+        assert cards.pack_cards([0, 51]) == [cards.INTS[0], cards.INTS[51]]
+        for value in (-1, 52, 0x08004B24):
+            with pytest.raises(ValueError):
+                cards.pack_card(value)
+            with pytest.raises(ValueError):
+                cards.card_index(value)
+
+    def test_encode_exception(self):
+        with pytest.raises(ValueError):
+            cards.encode(cards.Card('11', 'hearts'))
+
+    def test_decode_exception(self):
+        with pytest.raises(ValueError):
+            cards.decode(0)
+
+
+class TestDeckDefinition:
+
+    def test_decks(self):
+        assert len(cards.STANDARD) == 52
+        assert cards.get_deck() is cards.STANDARD
+        short = cards.get_deck('shortdeck')
+        assert len(short) == 36
+        assert short.wheel == [14, 9, 8, 7, 6]
+        assert short.flush_beats_full_house
+        assert not cards.STANDARD.flush_beats_full_house
+        assert cards.STANDARD.wheel == [14, 5, 4, 3, 2]
+
+    def test_custom(self):
+        deck = cards.DeckDefinition('custom', 'AKQJT2')
+        assert deck.ranks == '2TJQKA'
+        assert deck.wheel == [14, 12, 11, 10, 2]
+        assert deck == cards.DeckDefinition('other', '2TJQKA')
+        assert deck != cards.DeckDefinition('custom', '2TJQKA', False)
+        assert cards.DeckDefinition('royal', 'TJQKA').wheel is None
+        for ranks in ('TJQK', 'TJQKK', 'TJQKX'):
+            with pytest.raises(ValueError):
+                cards.DeckDefinition('bad', ranks)
+        with pytest.raises(ValueError):
+            cards.get_deck('pinochle')
+
+    def test_cards_deck(self):
+        deck = cards.CardsDeck(deck='shortdeck')
+        assert len(deck) == 36
+        assert deck.ranks == list('6789TJQKA')
+        assert all(card.rank in deck.ranks for card in deck)
+        assert cards.CardsDeck(encoded=True, deck='piquet')[0] == \
+            cards.encode(cards.Card('7', 'spades'))
+        assert cards.Table(deck='piquet').deck.definition.name == 'piquet'
+
 
 class TestPlayer:
 
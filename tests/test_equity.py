@@ -0,0 +1,210 @@
+from itertools import combinations
+
+import pytest
+
+from pypoker.cards import INTS, Card, card_index, encode
+from pypoker.equity import EquityResult, adaptive_equity, equity, \
+    exact_equity
+from pypoker.lookup import default_table
+
+
+def cards(text):
+    suits = {'s': 'spades', 'h': 'hearts', 'd': 'diamonds', 'c': 'clubs'}
+    return [Card(card[0], suits[card[1]]) for card in text.split()]
+
+
+def brute_force(hole_cards, board):
+    evaluate = default_table().evaluate_best
+    hole_cards = [[encode(card) for card in hole] for hole in hole_cards]
+    board = [encode(card) for card in board]
+    known = set(board).union(*hole_cards)
+    deck = [card for card in INTS if card not in known]
+    wins = [0] * len(hole_cards)
+    ties = [0] * len(hole_cards)
+    shares = [0.0] * len(hole_cards)
+    boards = 0
+    for rest in combinations(deck, 5 - len(board)):
+        strengths = [evaluate(hole + board + list(rest))
+                     for hole in hole_cards]
+        best = max(strengths)
+        winners = strengths.count(best)
+        for n, strength in enumerate(strengths):
+            if strength == best:
+                if winners == 1:
+                    wins[n] += 1
+                else:
+                    ties[n] += 1
+                shares[n] += 1 / winners
+        boards += 1
+    return [EquityResult(win / boards, tie / boards, share / boards, 0.0)
+            for win, tie, share in zip(wins, ties, shares)]
+
+
+class TestEquity:
+
+    def setup_class(self):
+        self.aces = [Card('A', 'spades'), Card('A', 'hearts')]
+        self.kings = [Card('K', 'spades'), Card('K', 'hearts')]
+        self.board = [Card('2', 'clubs'), Card('7', 'diamonds'),
+                      Card('9', 'clubs'), Card('J', 'hearts'),
+                      Card('3', 'diamonds')]
+
+    def test_river(self):
+        assert equity([self.aces, self.kings], self.board, trials=10) == [
+            EquityResult(1.0, 0.0, 1.0, 0.0), EquityResult(0.0, 0.0, 0.0, 0.0)]
+
+    def test_tie(self):
+        board = [Card('T', 'clubs'), Card('J', 'clubs'), Card('Q', 'clubs'),
+                 Card('K', 'clubs'), Card('A', 'clubs')]
+        results = equity([self.aces, self.kings], board, trials=10)
+        assert results == [EquityResult(0.0, 1.0, 0.5, 0.0)] * 2
+
+    def test_preflop(self):
+        aces, kings = equity([self.aces, self.kings], trials=20000,
+                             processes=1, seed=7)
+        assert aces.equity + kings.equity == pytest.approx(1.0)
+        assert aces.win + aces.tie + kings.win == pytest.approx(1.0)
+        assert abs(aces.equity - 0.8236) < 4 * aces.stderr
+        assert aces.stderr == pytest.approx(0.0027, abs=0.0005)
+
+    def test_seed(self):
+        args = [self.aces, self.kings], self.board[:3]
+        one = equity(*args, trials=12000, processes=1, seed=3)
+        two = equity(*args, trials=12000, processes=2, seed=3)
+        assert one == two
+        assert one != equity(*args, trials=12000, processes=1, seed=4)
+
+    def test_packed_and_dead_cards(self):
+        aces = [encode(card) for card in self.aces]
+        dead = [Card('K', 'clubs'), Card('K', 'diamonds')]
+        results = equity([aces, self.kings], self.board[:4], dead, trials=100)
+        assert results[1].equity == 0.0
+
+    def test_duplicate_exception(self):
+        with pytest.raises(ValueError):
+            equity([self.aces, self.aces], trials=10)
+        with pytest.raises(ValueError):
+            equity([self.aces, self.kings], dead=self.aces[:1], trials=10)
+
+    def test_arguments_exception(self):
+        with pytest.raises(ValueError):
+            equity([self.aces], trials=10)
+        with pytest.raises(ValueError):
+            equity([self.aces, self.kings], self.board + self.board[:1])
+        with pytest.raises(ValueError):
+            equity([self.aces, self.kings], trials=0)
+
+
+class TestExactEquity:
+
+    @pytest.mark.parametrize('hole_cards, board', [
+        ('As Ks|Qs Js', '2s 3s 4h'),
+        ('As Ah|Ks Kh', '2c 7d 9c'),
+        ('Ad Kc|Qs Jh', '2c 7d 9c'),
+        ('As Ks|Qs Js', '2s 7s'),
+        ('As 2s|Ks 3s|Qs 4s', '5s 6s'),
+        ('7c 8c|Ah Ad|Tc Td', '9c Jd Qh 2s'),
+    ])
+    def test_brute_force(self, hole_cards, board):
+        hole_cards = [cards(hole) for hole in hole_cards.split('|')]
+        expected = brute_force(hole_cards, cards(board))
+        results = exact_equity(hole_cards, cards(board))
+        for result, other in zip(results, expected):
+            assert tuple(result) == pytest.approx(tuple(other))
+
+    def test_river(self):
+        hole_cards = [cards('As Ah'), cards('Ks Kh')]
+        assert exact_equity(hole_cards, cards('2c 7d 9c Jh 3d')) == [
+            EquityResult(1.0, 0.0, 1.0, 0.0), EquityResult(0.0, 0.0, 0.0, 0.0)]
+
+    def test_card_indices(self):
+        hole_cards = [cards('As Ah'), cards('Ks Kh')]
+        board = cards('2c 7d 9c')
+        assert exact_equity([[card_index(card) for card in hole]
+                             for hole in hole_cards],
+                            [card_index(card) for card in board]) == \
+            exact_equity(hole_cards, board)
+        with pytest.raises(ValueError):
+            exact_equity([[52, 53], [54, 55]])
+
+    def test_dead_cards(self):
+        hole_cards = [cards('As Ah'), cards('Ks Kh')]
+        results = exact_equity(hole_cards, cards('2c 7d 9c Jh'),
+                               cards('Kc Kd'))
+        assert results[1].equity == 0.0
+
+    def test_preflop(self):
+        aces, kings = exact_equity([cards('As Ah'), cards('Ks Kh')])
+        assert aces.win == pytest.approx(0.82365, abs=1e-5)
+        assert aces.equity == pytest.approx(0.82637, abs=1e-5)
+        assert aces.tie == kings.tie
+        assert aces.equity + kings.equity == pytest.approx(1.0)
+
+
+class TestAdaptiveEquity:
+
+    @pytest.mark.parametrize('hole_cards, board', [
+        ('As Ah|Ks Kh', ''),
+        ('7c 2d|As Kh', ''),
+        ('Ah Kh|Qs Qc', '2h 7h Tc'),
+        ('8s 9s|Ac Kd|7h 7d', '6s Ts 2c'),
+    ])
+    def test_exact(self, hole_cards, board):
+        hole_cards = [cards(hole) for hole in hole_cards.split('|')]
+        expected = exact_equity(hole_cards, cards(board))
+        results, trials = adaptive_equity(hole_cards, cards(board),
+                                          target_stderr=0.005, seed=1)
+        assert trials < 100000
+        for result, other in zip(results, expected):
+            assert result.stderr <= 0.005
+            assert result.equity == pytest.approx(other.equity,
+                                                  abs=4 * result.stderr)
+            assert result.win == pytest.approx(other.win, abs=0.03)
+        assert sum(result.equity for result in results) == pytest.approx(1)
+
+    def test_stratified(self):
+        # Pairs on the board decide most of the pot: far fewer boards than
+        # plain sampling reach the same standard error.
+        aces, kings = cards('As Ah'), cards('Ks Kh')
+        results, trials = adaptive_equity([aces, kings], target_stderr=0.002,
+                                          seed=2)
+        plain = equity([aces, kings], trials=trials, processes=1, seed=2)
+        assert plain[0].stderr > 2 * results[0].stderr
+
+    def test_seed(self):
+        args = [cards('Ah Kh'), cards('Qs Qc')], cards('2h 7h Tc')
+        assert adaptive_equity(*args, seed=3, max_trials=4000) == \
+            adaptive_equity(*args, seed=3, max_trials=4000)
+
+    def test_max_trials(self):
+        results, trials = adaptive_equity(
+            [cards('Ah Kh'), cards('Qs Qc')], target_stderr=1e-6,
+            max_trials=3000, batch=500, seed=4)
+        assert trials <= 3000
+        assert results[0].stderr > 1e-6
+
+    @pytest.mark.parametrize('max_trials', [2, 3, 100, 1001])
+    def test_small_max_trials(self, max_trials):
+        results, trials = adaptive_equity(
+            [cards('As Ah'), cards('Ks Kh')], target_stderr=1e-6,
+            max_trials=max_trials, batch=500, seed=5)
+        assert max_trials - 2 < trials <= max_trials
+        assert sum(result.equity for result in results) == pytest.approx(1)
+
+    def test_river(self):
+        results, trials = adaptive_equity(
+            [cards('As Ah'), cards('Ks Kh')], cards('2c 7d 9c Jh 3d'))
+        assert results == [EquityResult(1.0, 0.0, 1.0, 0.0),
+                           EquityResult(0.0, 0.0, 0.0, 0.0)]
+        assert trials == 1
+
+    def test_arguments_exception(self):
+        hole_cards = [cards('As Ah'), cards('Ks Kh')]
+        with pytest.raises(ValueError):
+            adaptive_equity(hole_cards, target_stderr=0)
+        with pytest.raises(ValueError):
+            adaptive_equity(hole_cards, max_trials=0)
+        with pytest.raises(ValueError):
+            adaptive_equity(hole_cards, max_trials=1)
+        with pytest.raises(ValueError):
+            adaptive_equity(hole_cards[:1])
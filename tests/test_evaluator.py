@@ -1,10 +1,14 @@
+import random
+
+import pytest
+
 from pypoker.cards import *
 from pypoker.evaluator import *
 
 
 class TestSetup:
 
-    def setup(self):
+    def setup_method(self):
         self.deck = CardsDeck()
         self.royal_flush = Hand(self.deck[8:13]) # [TS, JS, QS, KS, AS]
         self.straight_flush = Hand(self.deck[5:10]) # [7S, 8S, 9S, TS, JS]
@@ -35,6 +39,13 @@ class TestHand(TestSetup):
         assert ranks2 == self.low_straight.ranks
         assert suits2 == len(set(self.low_straight.suits))
 
+    def test_slots(self):
+        hand = Hand(self.deck[:5])
+        assert not hasattr(hand, '__dict__')
+        assert hand._ranks is None
+        assert hand.ranks == [6, 5, 4, 3, 2]
+        assert hand._ranks is hand.ranks
+
 
 class TestEvaluator(TestSetup):
 
@@ -97,3 +108,164 @@ class TestEvaluator(TestSetup):
         assert Evaluator.best_hand([self.flush, self.full_house, self.pair]) == [self.full_house]
         assert Evaluator.best_hand([self.high_card, self.high_card_A]) == [self.high_card_A]
         assert Evaluator.best_hand([self.high_card_A, self.three_of_kind]) == [self.three_of_kind]
+
+
+class TestEncodedHand(TestSetup):
+
+    def test_encoded_hand_value(self):
+        for name, hand in vars(self).items():
+            if not isinstance(hand, Hand):
+                continue
+            encoded = Hand([encode(card) for card in hand.cards])
+            assert encoded.ranks == hand.ranks
+            assert str(encoded) == str(hand)
+            assert (Evaluator(encoded).hand_value() ==
+                    Evaluator(hand).hand_value()), name
+
+
+class TestLookupEngine(TestSetup):
+
+    def test_engine_exception(self):
+        with pytest.raises(ValueError):
+            Evaluator(self.flush, engine='abc')
+
+    def test_lookup_hand_value(self):
+        for name, hand in vars(self).items():
+            if not isinstance(hand, Hand) or len(hand.cards) != 5:
+                continue
+            assert (Evaluator(hand, 'lookup').hand_value() ==
+                    Evaluator(hand).hand_value()), name
+
+    def test_lookup_seven_cards(self):
+        ev = Evaluator(self.seven_card_royal_flush, 'lookup')
+        assert ev.strength() == 7462
+        assert ev.hand_value() == HandValue(800, None, [14, 13, 12, 11, 10])
+
+    def test_lookup_best_hand(self):
+        assert Evaluator.best_hand([self.royal_flush, self.straight],
+                                   'lookup') == [self.royal_flush]
+        assert Evaluator.best_hand([self.low_straight, self.straight],
+                                   'lookup') == [self.straight]
+        assert Evaluator.best_hand([self.high_card, self.high_card_A,
+                                    self.high_card_A], 'lookup') == [
+            self.high_card_A, self.high_card_A]
+
+
+class TestHandValueCache(TestSetup):
+
+    def test_maxsize_exception(self):
+        with pytest.raises(ValueError):
+            HandValueCache(0)
+
+    def test_key(self):
+        other_suits = Hand([Card(card.rank, 'hearts') for card in
+                            self.flush.cards])
+        assert (HandValueCache.key(self.flush) ==
+                HandValueCache.key(other_suits))
+        assert (HandValueCache.key(self.flush) !=
+                HandValueCache.key(self.flush, 'lookup'))
+        shuffled = Hand(self.two_pair.cards[::-1])
+        assert (HandValueCache.key(self.two_pair) ==
+                HandValueCache.key(shuffled))
+        assert (HandValueCache.key(self.straight) !=
+                HandValueCache.key(self.straight_flush))
+        assert (HandValueCache.key(self.seven_card_straight_flush) !=
+                HandValueCache.key(Hand(self.deck[5:10] + self.deck[23:25])))
+
+    def test_hand_value(self):
+        cache = HandValueCache(2)
+        for hand in (self.flush, self.pair, self.flush):
+            assert (Evaluator(hand, cache=cache).hand_value() ==
+                    Evaluator(hand).hand_value())
+        assert cache.info() == CacheInfo(1, 2, 2, 2)
+        Evaluator(self.straight, cache=cache).hand_value()
+        assert cache.info() == CacheInfo(1, 3, 2, 2)
+        Evaluator(self.pair, cache=cache).hand_value()
+        assert cache.info() == CacheInfo(1, 4, 2, 2)
+        cache.clear()
+        assert cache.info() == CacheInfo(0, 0, 2, 0)
+
+    def test_shared_cache(self):
+        cache = HandValueCache()
+        Evaluator.cache = cache
+        try:
+            hands = [self.royal_flush, self.straight, self.royal_flush]
+            assert Evaluator.best_hand(hands) == [self.royal_flush,
+                                                  self.royal_flush]
+            assert cache.info().hits == 1
+            assert len(cache) == 2
+        finally:
+            Evaluator.cache = None
+
+    def test_memoized(self):
+        ev = Evaluator(self.full_house)
+        assert ev.hand_value() is ev.hand_value()
+
+
+class TestShowdown(TestSetup):
+
+    def test_key(self):
+        def value_key(hand):
+            value = Evaluator(hand).hand_value()
+            return value.value, value.hand or [], value.ranks or []
+        hands = [hand for hand in vars(self).values()
+                 if isinstance(hand, Hand) and len(hand.cards) == 5]
+        rng = random.Random(3)
+        hands += [Hand(rng.sample(self.deck[:], 7)) for _ in range(300)]
+        hands.sort(key=value_key)
+        for low, high in zip(hands, hands[1:]):
+            low_key = Evaluator(low).key()
+            high_key = Evaluator(high).key()
+            if value_key(low) == value_key(high):
+                assert low_key == high_key
+            else:
+                assert low_key < high_key
+
+    def test_lookup_key(self):
+        assert Evaluator(self.royal_flush, 'lookup').key() == 7462
+
+    def test_showdown(self):
+        hands = [self.pair, self.royal_flush, self.flush, self.royal_flush,
+                 self.pair, self.high_card]
+        for engine in Evaluator.engines:
+            result = Evaluator.showdown(hands, engine)
+            assert result == Showdown([1, 3], [[1, 3], [0, 4]],
+                                      [[1, 3], [2], [0, 4], [5]])
+        assert Evaluator.showdown([]) == Showdown([], [], [])
+
+    def test_best_hand_empty(self):
+        assert Evaluator.best_hand([]) == []
+
+
+class TestDecks:
+
+    def test_short_deck_wheel(self):
+        hand = Hand([Card(rank, 'spades') for rank in 'A678'] +
+                    [Card('9', 'hearts')], 'shortdeck')
+        assert hand.ranks == [9, 8, 7, 6, 5]
+        assert Hand(hand.cards).ranks == [14, 9, 8, 7, 6]
+        for engine in Evaluator.engines:
+            assert Evaluator(hand, engine).hand_value().value == 400
+
+    def test_short_deck_engines(self):
+        rng = random.Random(5)
+        deck = get_deck('shortdeck')
+        for n in range(500):
+            hand = Hand(rng.sample(deck.cards, 5), deck)
+            values = {engine: Evaluator(hand, engine).hand_value().value
+                      for engine in Evaluator.engines}
+            assert len(set(values.values())) == 1, (hand, values)
+
+    def test_flush_beats_full_house(self):
+        flush = Hand([Card(rank, 'hearts') for rank in '679JK'], 'shortdeck')
+        full_house = Hand([Card('K', suit) for suit in SUITS[:3]] +
+                          [Card('6', suit) for suit in SUITS[:2]],
+                          'shortdeck')
+        for engine in Evaluator.engines:
+            assert Evaluator(flush, engine) > Evaluator(full_house, engine)
+            assert Evaluator.best_hand([full_house, flush], engine) == [flush]
+
+    def test_cache_key(self):
+        cards = [Card(rank, 'spades') for rank in 'A678'] + [Card('9', 'hearts')]
+        assert HandValueCache.key(Hand(cards)) != \
+            HandValueCache.key(Hand(cards, 'shortdeck'))
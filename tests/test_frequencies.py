@@ -0,0 +1,55 @@
+from collections import Counter
+from itertools import combinations
+from math import comb
+
+import pytest
+
+from pypoker.cards import get_deck
+from pypoker.frequencies import frequencies, main, strength_counts
+from pypoker.lookup import deck_table
+
+
+class TestFrequencies:
+
+    def test_five_cards(self):
+        assert list(frequencies(5).values()) == [
+            40, 624, 3744, 5108, 10200, 54912, 123552, 1098240, 1302540]
+
+    def test_six_cards(self):
+        assert sum(frequencies(6).values()) == comb(52, 6)
+        assert frequencies(6)[800] == 1844
+
+    def test_seven_cards(self):
+        assert list(frequencies(7).values()) == [
+            41584, 224848, 3473184, 4047644, 6180020, 6461620, 31433400,
+            58627800, 23294460]
+
+    def test_short_deck(self):
+        result = frequencies(5, 'shortdeck')
+        assert sum(result.values()) == comb(36, 5)
+        assert result[800] == 24
+        assert result[500] == 480
+        assert result[400] == 6120
+
+    def test_brute_force(self):
+        deck = get_deck('piquet')
+        table = deck_table(deck)
+        expected = Counter(table.evaluate(list(hand))
+                           for hand in combinations(deck.ints, 5))
+        assert strength_counts(5, deck) == expected
+
+    def test_strength_counts(self):
+        counts = strength_counts(5)
+        assert len(counts) == 7462
+        # Every distinct 5-card flush comes in 4 suits.
+        assert counts[max(counts)] == 4
+
+    def test_exception(self):
+        with pytest.raises(ValueError):
+            strength_counts(4)
+        with pytest.raises(ValueError):
+            strength_counts(8)
+
+    def test_main(self, capsys):
+        assert main(['--cards', '5']) == 0
+        assert '2,598,960' in capsys.readouterr().out
@@ -0,0 +1,126 @@
+import pytest
+
+from pypoker import cards
+from pypoker.history import (HandHistoryReader, HandHistoryWriter, RECORD,
+                             HEADER)
+from pypoker.poker import PokerTable, PokerPlayer
+from pypoker.rng import SeededRNG
+
+
+class TestHandHistory:
+
+    def setup_method(self):
+        self.hole = [[cards.CARDS[0], cards.CARDS[13]],
+                     [cards.INTS[51], cards.INTS[50]],
+                     [7, 8]]
+        self.board = [cards.CARDS[1], cards.CARDS[2], cards.CARDS[3]]
+
+    def test_record_size(self):
+        assert RECORD.size == 128
+        assert HEADER.size == 16
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / 'hands.bin')
+        with HandHistoryWriter(path, buffer_size=2) as writer:
+            for hand_id in range(5):
+                writer.write(hand_id, self.hole, self.board, [10, 20, 0],
+                             [hand_id % 3])
+        with HandHistoryReader(path) as reader:
+            assert len(reader) == 5
+            record = reader[3]
+            assert record.hand_id == 3
+            assert record.hole_cards == ((0, 13), (51, 50), (7, 8))
+            assert record.board == (1, 2, 3)
+            assert record.bets == (10, 20, 0)
+            assert record.winners == (0,)
+            assert [record.hand_id for record in reader] == list(range(5))
+            assert reader[-1].hand_id == 4
+            assert len(reader.raw(0)) == RECORD.size
+            with pytest.raises(IndexError):
+                reader[5]
+
+    def test_append(self, tmp_path):
+        path = str(tmp_path / 'hands.bin')
+        for hand_id in range(2):
+            with HandHistoryWriter(path) as writer:
+                writer.write(hand_id, self.hole)
+        with HandHistoryReader(path) as reader:
+            assert [record.board for record in reader] == [(), ()]
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / 'hands.bin'
+        path.write_bytes(b'not a history file')
+        with pytest.raises(ValueError):
+            HandHistoryReader(str(path))
+        with pytest.raises(ValueError):
+            HandHistoryWriter(str(path))
+        with HandHistoryWriter(str(tmp_path / 'other.bin')) as writer:
+            with pytest.raises(ValueError):
+                writer.write(0, [[0, 1]] * 11)
+            with pytest.raises(ValueError):
+                writer.write(0, self.hole, winners=[3])
+            with pytest.raises(ValueError):
+                writer.write(0, self.hole, winners=[-1])
+            assert writer.count == 0
+
+    def test_close_views(self, tmp_path):
+        path = str(tmp_path / 'hands.bin')
+        with HandHistoryWriter(path) as writer:
+            writer.write(7, self.hole)
+        reader = HandHistoryReader(path)
+        raw = reader.raw(0)
+        with pytest.raises(BufferError):
+            reader.close()
+        assert reader[0].hand_id == 7
+        assert reader.raw(0) == raw
+        raw.release()
+        reader.close()
+
+    def test_table(self, tmp_path):
+        table = PokerTable(rng=SeededRNG(3))
+        for name in 'abc':
+            table.sit_player(PokerPlayer(name))
+        table.start_game()
+        table.deal_cards()
+        path = str(tmp_path / 'hands.bin')
+        with HandHistoryWriter(path) as writer:
+            writer.record(table, bets=[5, 5, 5])
+        winners = table.showdown().winners
+        with HandHistoryReader(path) as reader:
+            record = reader[0]
+        assert record.hole_cards == tuple(
+            tuple(cards.card_index(card) for card in player.cards)
+            for player in table.players)
+        assert record.board == tuple(cards.card_index(card)
+                                     for card in table.cards)
+        assert [table.players[seat] for seat in record.winners] == winners
+
+    def test_table_seven_cards(self, tmp_path):
+        # The 2-6 straight beats the aces.
+        table = PokerTable()
+        players = [PokerPlayer('straight'), PokerPlayer('aces')]
+        for player, hole in zip(players, ([0, 40], [12, 51])):
+            table.sit_player(player)
+            for card in hole:
+                player.receive_card(cards.CARDS[card])
+        for card in (28, 16, 30, 46, 37):
+            table.receive_card(cards.CARDS[card])
+        path = str(tmp_path / 'hands.bin')
+        with HandHistoryWriter(path) as writer:
+            writer.record(table)
+        with HandHistoryReader(path) as reader:
+            assert reader[0].winners == (0,)
+
+    def test_as_array(self, tmp_path):
+        np = pytest.importorskip('numpy')
+        path = str(tmp_path / 'hands.bin')
+        with HandHistoryWriter(path) as writer:
+            for hand_id in range(3):
+                writer.write(hand_id, self.hole, self.board, [1, 2, 3], [1])
+        reader = HandHistoryReader(path)
+        array = reader.as_array()
+        assert list(array['hand_id']) == [0, 1, 2]
+        assert np.all(array['winners'] == 2)
+        assert list(array['bets'][0][:3]) == [1, 2, 3]
+        del array
+        reader.close()
@@ -0,0 +1,60 @@
+from collections import Counter
+from itertools import combinations
+
+from pypoker.cards import *
+from pypoker.evaluator import *
+from pypoker.lookup import LookupTable, CATEGORIES
+
+
+class TestLookupTable:
+
+    def setup_class(self):
+        self.table = LookupTable()
+
+    def test_classes(self):
+        categories = Counter(self.table.category(strength) for strength in
+                             range(1, self.table.max_strength + 1))
+        assert self.table.max_strength == 7462
+        assert categories == {800: 10, 700: 156, 600: 156, 500: 1277,
+                              400: 10, 300: 858, 200: 858, 100: 2860,
+                              0: 1277}
+
+    def test_ordering(self):
+        def key(value):
+            return value.value, value.hand or [], value.ranks or []
+        values = self.table.values[1:]
+        # Norvig ignores kickers on trips, so equal keys are allowed there
+        assert all(key(low) <= key(high) for low, high in
+                   zip(values, values[1:]))
+
+    def test_evaluate(self):
+        deck = CardsDeck(encoded=True)
+        assert self.table.evaluate(deck[8:13]) == 7462
+        assert self.table.evaluate(deck[0:4] + [deck[12]]) == 7453
+        assert self.table.evaluate(deck[0:4] + [deck[25]]) == 5854
+        assert self.table.evaluate([deck[5], deck[16], deck[28], deck[40],
+                                    deck[0]]) == 1
+
+    def test_evaluate_best(self):
+        deck = CardsDeck(encoded=True)
+        assert self.table.evaluate_best(deck[6:13]) == 7462
+        assert self.table.category(self.table.evaluate_best(
+            deck[0:52:13] + deck[1:3])) == 700
+
+    def test_all_hands(self):
+        evaluate = self.table.evaluate
+        hand_value = self.table.hand_value
+        norvig = {}
+        categories = Counter()
+        for cards in combinations(INTS, 5):
+            value = hand_value(evaluate(cards))
+            ranks = tuple(sorted(card_rank(card) for card in cards))
+            key = ranks, bool(cards[0] & cards[1] & cards[2] & cards[3] &
+                              cards[4] & 0xF000)
+            if key not in norvig:
+                norvig[key] = Evaluator(Hand(list(cards))).hand_value()
+            assert value == norvig[key], [decode(card) for card in cards]
+            categories[value.value] += 1
+        assert categories == {800: 40, 700: 624, 600: 3744, 500: 5108,
+                              400: 10200, 300: 54912, 200: 123552,
+                              100: 1098240, 0: 1302540}
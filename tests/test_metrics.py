@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import time
+
+from pypoker import metrics
+from pypoker.evaluator import Evaluator, Hand, HandValueCache
+from pypoker.cards import CardsDeck
+from pypoker.poker import PokerTable, PokerPlayer
+
+
+class TestMetrics:
+
+    def setup_method(self):
+        metrics.reset()
+        deck = CardsDeck()
+        self.hands = [Hand(deck[0:5]), Hand(deck[8:13])]
+
+    def teardown_method(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled(self):
+        original = Evaluator.hand_value
+        Evaluator.best_hand(self.hands)
+        assert not metrics.enabled()
+        assert metrics.snapshot()['timings'] == {}
+        metrics.enable()
+        metrics.disable()
+        assert Evaluator.hand_value is original
+        assert isinstance(Evaluator.__dict__['best_hand'], classmethod)
+
+    def test_enable(self):
+        metrics.enable()
+        metrics.enable()
+        assert metrics.enabled()
+        assert Evaluator.best_hand(self.hands) == [self.hands[1]]
+        timings = metrics.snapshot()['timings']
+        assert timings['Evaluator.best_hand']['count'] == 1
+        assert timings['Evaluator.hand_value']['count'] == 2
+        assert timings['Evaluator.flush']['count'] >= 2
+        assert sum(timings['Evaluator.best_hand']['buckets']) == 1
+
+    def test_deal_cards(self):
+        metrics.enable()
+        table = PokerTable()
+        table.sit_player(PokerPlayer('1'))
+        table.sit_player(PokerPlayer('2'))
+        table.start_game()
+        table.deal_cards()
+        assert metrics.snapshot()['timings']['PokerTable.deal_cards'][
+            'count'] == 1
+
+    def test_caches(self):
+        cache = HandValueCache()
+        metrics.watch_cache('test', cache)
+        for hand in self.hands + self.hands:
+            Evaluator(hand, cache=cache).hand_value()
+        assert metrics.snapshot()['caches']['test'] == {
+            'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+    def test_export_text(self):
+        metrics.watch_cache('test', HandValueCache())
+        metrics.enable()
+        Evaluator.best_hand(self.hands)
+        text = metrics.export_text()
+        assert '# TYPE pypoker_evaluator_best_hand_seconds histogram' in text
+        assert 'pypoker_evaluator_best_hand_seconds_bucket{le="+Inf"} 1' in text
+        assert 'pypoker_evaluator_best_hand_seconds_count 1' in text
+        assert 'pypoker_cache_hits{cache="test"}' in text
+
+    def test_configure(self):
+        metrics.configure({'PYPOKER_METRICS': '0'})
+        assert not metrics.enabled()
+        metrics.configure({'PYPOKER_METRICS': '1'})
+        assert metrics.enabled()
+
+
+class TestSamplingProfiler:
+
+    def test_collapsed(self):
+        with metrics.SamplingProfiler(interval=0.001) as profiler:
+            end = time.time() + 0.1
+            while time.time() < end:
+                Evaluator(Hand(CardsDeck()[0:7])).hand_value()
+        assert profiler.stacks
+        assert 'test_collapsed' in profiler.collapsed()
+
+    def test_environment(self, tmp_path):
+        path = str(tmp_path / 'profile.txt')
+        code = ('import time, pypoker.poker as poker\n'
+                'end = time.time() + 0.2\n'
+                'while time.time() < end: poker.test_play(3)\n')
+        env = dict(os.environ, PYPOKER_PROFILE=path, PYPOKER_METRICS='1')
+        subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                       cwd=os.path.dirname(os.path.dirname(__file__)))
+        assert 'test_play' in open(path).read()
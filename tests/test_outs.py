@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from pypoker.cards import *
+from pypoker.lookup import deck_table
+from pypoker.outs import outs
+from pypoker.statetable import BoardState, default_table as state_table
+
+
+def cards(text):
+    return [INTS['sdch'.index(card[1]) * 13 + RANKS.index(card[0])]
+            for card in text.split()]
+
+
+def brute_force(hole, board, opponents, deck=None):
+    # One BoardState per candidate card.
+    deck = get_deck(deck)
+    lookup = deck_table(deck)
+    table = state_table(deck)
+    known = hole + board + [card for cards in opponents for card in cards]
+    current = lookup.category(BoardState(board, table).evaluate(hole))
+    results = {}
+    for card in deck.ints:
+        if card in known:
+            continue
+        state = BoardState(board + [card], table)
+        hero = state.evaluate(hole)
+        best = max([state.evaluate(cards) for cards in opponents], default=0)
+        results[card_index(card)] = (lookup.category(hero), hero > best,
+                                     hero == best, hero)
+    return current, results
+
+
+class TestOuts:
+
+    def test_flush_draw(self):
+        result = outs(cards('As Ks'), cards('2s 7s Td'), [cards('Th Tc')])
+        assert result.category == 0
+        assert result.counts == {500: 9, 100: 12}
+        # Every spade but the one giving the opponent quads.
+        assert mask_indices(result.leading) == [
+            index for index in range(13) if index not in (0, 5, 8, 11, 12)]
+        assert result.tying == 0
+        assert bin(result.unseen).count('1') == 45
+
+    def test_card_formats(self):
+        hole, board = cards('Ah Kh'), cards('Qh Jh 2c 3d')
+        expected = outs(hole, board)
+        assert outs([decode(card) for card in hole], board) == expected
+        assert outs([card_index(card) for card in hole],
+                    [card_index(card) for card in board]) == expected
+        assert expected.counts[800] == 1
+        assert expected.counts[400] == 3
+
+    @pytest.mark.parametrize('deck', ['standard', 'shortdeck'])
+    def test_brute_force(self, deck):
+        rng = random.Random(8)
+        definition = get_deck(deck)
+        for n in range(30):
+            board_size = rng.choice((3, 4))
+            dealt = rng.sample(definition.ints, board_size + 6)
+            hole, board = dealt[:2], dealt[2:2 + board_size]
+            opponents = [dealt[-4:-2], dealt[-2:]]
+            result = outs(hole, board, opponents, deck=deck)
+            current, expected = brute_force(hole, board, opponents, deck)
+            assert result.category == current
+            assert result.categories == {
+                index: value[0] for index, value in expected.items()}
+            assert mask_indices(result.leading) == sorted(
+                index for index, value in expected.items() if value[1])
+            assert mask_indices(result.tying) == sorted(
+                index for index, value in expected.items() if value[2])
+            assert mask_indices(result.unseen) == sorted(expected)
+            lookup = deck_table(deck)
+            improving = [index for index, value in expected.items()
+                         if lookup.categories.index(value[0]) >
+                         lookup.categories.index(current)]
+            assert mask_indices(result.improving) == sorted(improving)
+            assert sum(result.counts.values()) == len(improving)
+
+    def test_no_opponents(self):
+        result = outs(cards('9c 8c'), cards('7d 6h 2s'))
+        assert result.leading == result.unseen
+        assert result.counts == {400: 8, 100: 15}
+
+    def test_dead_cards(self):
+        result = outs(cards('9c 8c'), cards('7d 6h 2s'),
+                      dead=cards('Td 5h'))
+        assert result.counts[400] == 6
+        assert not result.unseen & card_mask(cards('Td 5h'))
+
+    def test_exceptions(self):
+        with pytest.raises(ValueError):
+            outs(cards('As Ks'), cards('2s 7s'))
+        with pytest.raises(ValueError):
+            outs(cards('As Ks'), cards('As 7s Td'))
+        with pytest.raises(ValueError):
+            outs(cards('As Ks'), cards('2s 7s Td'), [cards('Th')])
@@ -52,7 +52,7 @@ class TestPokerPlayer:
 
 class TestPokerTable:
 
-    def setup(self):
+    def setup_method(self):
         self.table = poker.PokerTable(max_players=3)
         self.player1 = poker.PokerPlayer('player1')
         self.player2 = poker.PokerPlayer('player2')
@@ -91,3 +91,87 @@ class TestPokerTable:
         with pytest.raises(poker.TooManyCards):
             self.table.deal_cards()
 
+
+    def test_table_equity(self):
+        self.table.sit_player(self.player1)
+        self.table.sit_player(self.player2)
+        self.table.start_game()
+        self.table.deal_cards()
+        results = self.table.equity(trials=10)
+        assert len(results) == 2
+        assert sum(result.equity for result in results) == pytest.approx(1)
+
+    def test_table_adaptive_equity(self):
+        self.table.sit_player(self.player1)
+        self.table.sit_player(self.player2)
+        self.table.start_game()
+        self.table.deal_cards()
+        results, trials = self.table.adaptive_equity(max_trials=100)
+        assert len(results) == 2
+        assert trials == 1
+        assert sum(result.equity for result in results) == pytest.approx(1)
+
+    def test_table_equity_folded(self):
+        self.table.sit_player(self.player1)
+        self.table.sit_player(self.player2)
+        self.table.sit_player(self.player3)
+        self.table.start_game()
+        self.table.deal_cards()
+        self.player2.fold()
+        winners = self.table.showdown().winners
+        results = self.table.equity(trials=10, processes=1)
+        assert results[1] == (0.0, 0.0, 0.0, 0.0)
+        assert [player for player, result in zip(self.table.players, results)
+                if result.equity] == winners
+        results, _ = self.table.adaptive_equity(max_trials=100)
+        assert results[1] == (0.0, 0.0, 0.0, 0.0)
+        assert sum(result.equity for result in results) == pytest.approx(1)
+
+    def test_table_showdown(self):
+        self.table.sit_player(self.player1)
+        self.table.sit_player(self.player2)
+        self.table.sit_player(self.player3)
+        self.table.start_game()
+        self.table.deal_cards()
+        self.player3.fold()
+        result = self.table.showdown()
+        assert sum(map(len, result.ordering)) == 2
+        assert self.player3 not in result.ordering[0] + result.ordering[-1]
+        assert result.winners == result.ordering[0]
+
+    def test_table_showdown_seven_cards(self):
+        # The 2-6 straight beats the aces.
+        self.table.sit_player(self.player1)
+        self.table.sit_player(self.player2)
+        suits = {'s': 'spades', 'h': 'hearts', 'd': 'diamonds', 'c': 'clubs'}
+        for player, hole in ((self.player1, '2s 3h'), (self.player2, 'As Ah')):
+            for card in hole.split():
+                player.receive_card(poker.Card(card[0], suits[card[1]]))
+        for card in '4c 5d 6c 9h Kc'.split():
+            self.table.receive_card(poker.Card(card[0], suits[card[1]]))
+        for engine in ('state', 'lookup', 'board'):
+            assert self.table.showdown(engine).winners == [self.player1]
+        assert self.table.showdown().winners == [self.player1]
+
+    def test_table_showdown_state(self):
+        for player in (self.player1, self.player2, self.player3):
+            self.table.sit_player(player)
+        self.table.start_game()
+        self.table.deal_cards()
+        result = self.table.showdown('state')
+        assert result == self.table.showdown('lookup')
+        assert self.table.board_state().street == 'river'
+
+    def test_table_showdown_board(self):
+        for player in (self.player1, self.player2, self.player3):
+            self.table.sit_player(player)
+        self.table.start_game()
+        self.table.deal_cards()
+        assert self.table.showdown('board') == self.table.showdown('state')
+
+    def test_table_slots(self):
+        self.table.sit_player(self.player1)
+        assert not hasattr(self.table, '__dict__')
+        assert not hasattr(self.player1, '__dict__')
+        with pytest.raises(AttributeError):
+            self.table.anything = 1
@@ -0,0 +1,108 @@
+from array import array
+
+import pytest
+
+from pypoker import preflop
+from pypoker.cards import Card
+from pypoker.preflop import (CLASSES, HAND_CLASSES, PreflopTable,
+                             class_combos, class_equity, class_index)
+
+
+def injected_matrix():
+    matrix = array('f', [0.5] * (CLASSES * CLASSES))
+    for hero in range(CLASSES):
+        for villain in range(hero + 1, CLASSES):
+            value = (hero + 1) / (hero + villain + 2)
+            matrix[hero * CLASSES + villain] = value
+            matrix[villain * CLASSES + hero] = 1 - value
+    return matrix
+
+
+class TestClasses:
+
+    def test_names(self):
+        assert len(set(HAND_CLASSES)) == CLASSES
+        assert HAND_CLASSES[:2] == ('AA', 'AKs')
+        assert HAND_CLASSES[13] == 'AKo'
+        assert HAND_CLASSES[-1] == '22'
+
+    def test_combos(self):
+        assert sum(len(class_combos(n)) for n in range(CLASSES)) == 1326
+        assert len(class_combos(class_index('T9o'))) == 12
+
+    def test_class_index(self):
+        assert class_index('AKs') == 1
+        assert class_index(13) == 13
+        assert class_index([Card('A', 'hearts'), Card('K', 'hearts')]) == 1
+        assert class_index([Card('K', 'spades'), Card('A', 'hearts')]) == 13
+        assert class_index([Card('2', 'spades'), Card('2', 'hearts')]) == 168
+        with pytest.raises(ValueError):
+            class_index('AAs')
+        with pytest.raises(ValueError):
+            class_index(169)
+
+    def test_canonical(self):
+        assert preflop._canonical((51, 38, 25, 12)) == (12, 25, 38, 51)
+
+
+class TestPreflopTable:
+
+    def test_class_equity(self):
+        assert class_equity('AA', 'KK', trials=2000, seed=1) == \
+            pytest.approx(0.8195, abs=0.02)
+
+    def test_generate(self, monkeypatch):
+        monkeypatch.setattr(preflop, '_row', lambda args: [
+            0.25 for _ in range(args[0] + 1, CLASSES)])
+        table = PreflopTable.generate(trials=1, seed=1, processes=1)
+        assert table.equity('AA', 'KK') == 0.25
+        assert table.equity('KK', 'AA') == 0.75
+        assert table.equity('AA', 'AA') == 0.5
+        assert table.trials == 1
+
+    def test_save_load(self, tmp_path):
+        path = str(tmp_path / 'preflop.bin')
+        PreflopTable(injected_matrix(), trials=5).save(path)
+        table = PreflopTable.load(path)
+        assert table.trials == 5
+        assert table.path == path
+        assert table.equity('AA', 'AKs') == pytest.approx(1 / 3)
+        assert table.equity(1, 0) == pytest.approx(2 / 3)
+        cards = [Card('A', 'spades'), Card('A', 'hearts')]
+        assert table.equity(cards, 'AKs') == pytest.approx(1 / 3)
+
+    def test_checksum(self, tmp_path):
+        path = tmp_path / 'preflop.bin'
+        PreflopTable(injected_matrix()).save(str(path))
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError):
+            PreflopTable.load(str(path))
+        with pytest.raises(ValueError):
+            PreflopTable([0.5])
+
+    def test_default_table(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('PYPOKER_CACHE', str(tmp_path))
+        monkeypatch.setattr(preflop, '_table', None)
+        PreflopTable(injected_matrix()).save(preflop.default_path())
+        assert preflop.preflop_equity('AKs', 'AA') == pytest.approx(2 / 3)
+        assert preflop.default_table() is preflop.default_table()
+
+    def test_generate_default(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('PYPOKER_CACHE', str(tmp_path / 'cache'))
+        monkeypatch.setattr(preflop, '_table', None)
+        calls = []
+
+        def generate(cls, trials, seed):
+            calls.append((trials, seed))
+            return cls(injected_matrix(), trials)
+        monkeypatch.setattr(PreflopTable, 'generate', classmethod(generate))
+        table = preflop.default_table()
+        assert calls == [(preflop.DEFAULT_TRIALS, 0)]
+        assert table.trials == preflop.DEFAULT_TRIALS
+        assert table.path == preflop.default_path()
+        assert preflop.preflop_equity('AKs', 'AA') == pytest.approx(2 / 3)
+        monkeypatch.setattr(preflop, '_table', None)
+        preflop.default_table()
+        assert len(calls) == 1
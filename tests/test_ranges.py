@@ -0,0 +1,103 @@
+from itertools import combinations
+
+import pytest
+
+from pypoker.cards import INTS, RANKS
+from pypoker.ranges import (COMBOS, Range, combo_index, combo_strengths,
+                            parse_range, range_equity)
+from pypoker.statetable import default_table
+
+
+def card(text):
+    return 'sdch'.index(text[1]) * 13 + RANKS.index(text[0])
+
+
+def brute_force(hero, villain, board):
+    evaluate = default_table().evaluate
+    board = [card(text) for text in board.split()]
+    deck = [n for n in range(52) if n not in board]
+    wins = ties = total = 0.0
+    for h_combo, h_weight in hero:
+        for v_combo, v_weight in villain:
+            hole = set(COMBOS[h_combo] + COMBOS[v_combo])
+            if len(hole) < 4 or hole.intersection(board):
+                continue
+            for rest in combinations([n for n in deck if n not in hole],
+                                     5 - len(board)):
+                full = [INTS[n] for n in board + list(rest)]
+                h = evaluate([INTS[n] for n in COMBOS[h_combo]] + full)
+                v = evaluate([INTS[n] for n in COMBOS[v_combo]] + full)
+                weight = h_weight * v_weight
+                total += weight
+                wins += weight if h > v else 0
+                ties += weight if h == v else 0
+    return wins / total, ties / total
+
+
+class TestParseRange:
+
+    @pytest.mark.parametrize('text, count', [
+        ('AA', 6), ('AKs', 4), ('AKo', 12), ('AK', 16), ('KA', 16),
+        ('QQ+', 18), ('ATs+', 16), ('ATo+', 48), ('22-55', 24),
+        ('55-22', 24), ('AK-QJ', 48), ('T9s-76s', 16), ('A2s-A5s', 16), ('AhKd', 1),
+        ('QQ+, AKs, T9s-76s, 22-55', 62), ('AA, AA', 6), ('', 0)])
+    def test_count(self, text, count):
+        assert len(parse_range(text)) == count
+
+    def test_weights(self):
+        weights = parse_range('AA:0.5, KK, AsAh:0.25, QQ:0')
+        assert weights[combo_index(card('As'), card('Ah'))] == 0.25
+        assert weights[combo_index(card('Ad'), card('Ac'))] == 0.5
+        assert weights[combo_index(card('Kd'), card('Kc'))] == 1.0
+        assert len(weights) == 12
+
+    def test_suited(self):
+        combos = Range('AKs').combos()
+        assert all(first // 13 == second // 13 for first, second in combos)
+
+    @pytest.mark.parametrize('text', [
+        'AAs', 'AX', 'AKx', 'A', 'AK-QT', 'AKs-QJo', 'AsAs', 'AA:-1'])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_range(text)
+
+    def test_remove(self):
+        assert len(Range('AA, KK').remove([card('As')])) == 9
+        assert len(Range('AKs').remove([INTS[card('Ks')]])) == 3
+
+    def test_combo_strengths(self):
+        table = default_table()
+        board = [INTS[card(text)] for text in 'Ks 7s 2c Jh 9s'.split()]
+        combos = sorted(Range('AA, KQs, 76s, 32o').remove(board).weights)
+        assert combo_strengths(table, board, combos) == [
+            table.evaluate([INTS[n] for n in COMBOS[combo]] + board)
+            for combo in combos]
+
+
+class TestRangeEquity:
+
+    @pytest.mark.parametrize('hero, villain, board', [
+        ('AA, AKs', 'KK, QJs', 'Ks 7d 2c Jh'),
+        ('JJ+:0.5, T9s', '88, AhKh', 'Th 9h 2d 3s'),
+        ('AsKs', 'QQ', 'Qs Js Ts 2d 3c'),
+    ])
+    def test_brute_force(self, hero, villain, board):
+        result, other = range_equity(
+            hero, villain, [INTS[card(text)] for text in board.split()])
+        wins, ties = brute_force(Range(hero), Range(villain), board)
+        assert result.win == pytest.approx(wins)
+        assert result.tie == pytest.approx(ties)
+        assert result.equity + other.equity == pytest.approx(1)
+        assert result.stderr == 0
+
+    def test_sampled(self):
+        result, other = range_equity('AA', 'KK', trials=2000, seed=1)
+        assert result.equity == pytest.approx(0.826, abs=4 * result.stderr)
+        assert range_equity('AA', 'KK', trials=100, seed=3) == \
+            range_equity('AA', 'KK', trials=100, seed=3)
+
+    def test_conflicts(self):
+        with pytest.raises(ValueError):
+            range_equity('AsAh', 'AsKs', trials=10)
+        with pytest.raises(ValueError):
+            range_equity('AA', 'KK', trials=0)
@@ -0,0 +1,83 @@
+import pickle
+
+import pytest
+
+from pypoker import cards, poker
+from pypoker.rng import SecureRNG, SeededRNG, new_rng
+
+
+class TestSeededRNG:
+
+    def test_seed(self):
+        assert SeededRNG(1).random() == SeededRNG(1).random()
+        assert SeededRNG(1).random() != SeededRNG(2).random()
+
+    def test_random_seed(self):
+        rng = SeededRNG()
+        assert isinstance(rng.root_seed, int)
+        assert SeededRNG(rng.root_seed).random() == rng.random()
+
+    def test_streams(self):
+        rng = SeededRNG(5)
+        streams = rng.spawn(3)
+        assert [stream.key for stream in streams] == [(0,), (1,), (2,)]
+        values = [stream.random() for stream in streams]
+        assert len(set(values)) == 3
+        assert rng.stream(1).random() == values[1]
+        assert rng.stream(1).stream(0).key == (1, 0)
+
+    def test_randbelow(self):
+        rng = SeededRNG(0)
+        assert all(0 <= rng.randbelow(7) < 7 for _ in range(100))
+        assert {SecureRNG().randbelow(3) for _ in range(200)} == {0, 1, 2}
+        with pytest.raises(ValueError):
+            rng.randbelow(0)
+
+    def test_pickle(self):
+        rng = SeededRNG(9, (4,))
+        rng.random()
+        copy = pickle.loads(pickle.dumps(rng))
+        assert (copy.root_seed, copy.key) == (9, (4,))
+        assert copy.random() == rng.random()
+
+
+class TestNewRNG:
+
+    def test_secure(self):
+        assert isinstance(new_rng(), SecureRNG)
+        assert new_rng() is new_rng('secure')
+
+    def test_secure_seed_exception(self):
+        with pytest.raises(ValueError):
+            new_rng('secure', 1)
+
+    def test_fast(self):
+        rng = new_rng('fast', 3)
+        assert isinstance(rng, SeededRNG)
+        assert rng.root_seed == 3
+
+    def test_mode_exception(self):
+        with pytest.raises(ValueError):
+            new_rng('abc')
+
+
+class TestReplay:
+
+    def test_deck(self):
+        decks = [cards.CardsDeck(rng=SeededRNG(11)) for _ in range(2)]
+        for deck in decks:
+            deck.shuffle()
+        assert list(decks[0]) == list(decks[1])
+        assert isinstance(cards.CardsDeck().rng, SecureRNG)
+
+    def test_table(self):
+        dealt = []
+        for _ in range(2):
+            table = poker.PokerTable(rng=SeededRNG(12))
+            players = [poker.PokerPlayer(str(n)) for n in range(3)]
+            for player in players:
+                table.sit_player(player)
+            table.start_game()
+            table.deal_cards()
+            dealt.append([player.cards for player in players] + [table.cards])
+        assert dealt[0] == dealt[1]
@@ -0,0 +1,164 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from pypoker.history import HandHistoryReader, HandHistoryWriter
+from pypoker.poker import PokerPlayer, PokerTable
+from pypoker.rng import SeededRNG
+from pypoker.runner import ShowdownBatcher, TableManager
+
+
+async def check(player, turn):
+    return turn.to_call
+
+
+async def bettor(player, turn):
+    return turn.to_call + 10 if turn.street == 'flop' else turn.to_call
+
+
+async def folder(player, turn):
+    return None
+
+
+async def sleeper(player, turn):
+    await asyncio.sleep(10)
+
+
+async def raiser(player, turn):
+    raise RuntimeError('agent failed')
+
+
+def new_table(seed, players=3, chips=1000):
+    table = PokerTable(rng=SeededRNG(seed))
+    for n in range(players):
+        player = PokerPlayer('{}-{}'.format(seed, n))
+        player.add_chips(chips)
+        table.sit_player(player)
+    table.start_game()
+    return table
+
+
+class TestTableManager:
+
+    def test_showdown(self):
+        manager = TableManager()
+        table = new_table(1)
+        manager.add_table(table, [check, check, check])
+        [[result]] = asyncio.run(manager.run())
+        assert result.pot == 0
+        assert result.winners
+        assert result.winners == table.showdown('state').winners
+
+    def test_chips(self):
+        manager = TableManager()
+        tables = [new_table(seed) for seed in range(20)]
+        for table in tables:
+            manager.add_table(table, [bettor, check, check])
+        results = asyncio.run(manager.run(hands=3))
+        for table, table_results in zip(tables, results):
+            assert len(table_results) == 3
+            assert sum(player.chips for player in table.players) == 3000
+            for result in table_results:
+                assert result.pot == 30
+                assert result.bets == [10, 10, 10]
+
+    def test_fold(self):
+        manager = TableManager()
+        table = new_table(2)
+        manager.add_table(table, [bettor, folder, folder])
+        [[result]] = asyncio.run(manager.run())
+        assert result.winners == [table.players[0]]
+        assert result.pot == 0
+        assert table.players[0].chips == 1000
+
+    def test_timeout(self):
+        manager = TableManager(timeout=0.05)
+        slow = new_table(3)
+        fast = [new_table(seed) for seed in range(4, 10)]
+        manager.add_table(slow, [sleeper, check, check])
+        for table in fast:
+            manager.add_table(table, [check, check, check])
+        results = asyncio.run(manager.run(hands=2))
+        assert manager.timeouts == 2
+        assert all(slow.players[0] not in result.winners
+                   for result in results[0])
+        assert all(len(table_results) == 2 for table_results in results)
+
+    def test_error(self):
+        manager = TableManager()
+        broken = new_table(3)
+        fine = [new_table(seed) for seed in range(4, 10)]
+        manager.add_table(broken, [raiser, check, check])
+        for table in fine:
+            manager.add_table(table, [check, check, check])
+        results = asyncio.run(manager.run(hands=2))
+        assert manager.errors == 2
+        assert manager.timeouts == 0
+        assert all(broken.players[0] not in result.winners
+                   for result in results[0])
+        assert all(len(table_results) == 2 for table_results in results)
+
+    def test_agents(self):
+        manager = TableManager()
+        with pytest.raises(ValueError):
+            manager.add_table(new_table(1), [check])
+
+    def test_batching(self):
+        batcher = ShowdownBatcher(batch_size=8, max_delay=0.01)
+        manager = TableManager(batcher=batcher)
+        for seed in range(16):
+            manager.add_table(new_table(seed), [check, check, check])
+        asyncio.run(manager.run())
+        batcher.close()
+        assert batcher.batches == 2
+
+    def test_process_pool(self):
+        batcher = ShowdownBatcher()
+        manager = TableManager(batcher=batcher)
+        table = new_table(6)
+        manager.add_table(table, [check, check, check])
+        [[result]] = asyncio.run(manager.run())
+        assert isinstance(batcher.executor, ProcessPoolExecutor)
+        assert result.winners == table.showdown('state').winners
+        batcher.close()
+        assert batcher.executor is None
+
+    def test_executor(self):
+        with ThreadPoolExecutor(1) as executor:
+            batcher = ShowdownBatcher(executor=executor)
+            manager = TableManager(batcher=batcher)
+            manager.add_table(new_table(7), [check, check, check])
+            asyncio.run(manager.run())
+            batcher.close()
+            assert batcher.executor is executor
+
+    @pytest.mark.parametrize('variant', ['omaha', 'shortdeck'])
+    def test_variants(self, variant):
+        manager = TableManager()
+        tables = []
+        for seed in range(30):
+            table = PokerTable(rng=SeededRNG(seed), variant=variant)
+            for n in range(3):
+                table.sit_player(PokerPlayer(str(n)))
+            table.start_game()
+            manager.add_table(table, [check, check, check])
+            tables.append(table)
+        results = asyncio.run(manager.run())
+        for table, [result] in zip(tables, results):
+            assert result.winners == table.showdown().winners
+
+    def test_history(self, tmp_path):
+        path = str(tmp_path / 'hands.bin')
+        with HandHistoryWriter(path) as writer:
+            manager = TableManager(history=writer)
+            table = new_table(5)
+            manager.add_table(table, [bettor, folder, check])
+            [[result]] = asyncio.run(manager.run())
+        with HandHistoryReader(path) as reader:
+            record = reader[0]
+        assert record.bets == (10, 0, 10)
+        assert result.pot == 20
+        assert record.hole_cards[1] == (255, 255)
+        assert [table.players[seat] for seat in record.winners] == \
+            result.winners
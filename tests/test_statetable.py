@@ -0,0 +1,162 @@
+import random
+
+import pytest
+
+from pypoker.cards import *
+from pypoker.evaluator import *
+from pypoker.lookup import default_table as lookup_table
+from pypoker.lookup import deck_table
+from pypoker.statetable import (BoardState, StateTable, default_path,
+                                default_table)
+
+
+class TestStateTable:
+
+    def setup_class(self):
+        self.table = StateTable.generate()
+        self.lookup = lookup_table()
+
+    def test_len(self):
+        assert len(self.table) == 76155
+
+    def test_evaluate(self):
+        deck = CardsDeck(encoded=True)
+        assert self.table.evaluate(deck[6:13]) == 7462
+        assert self.table.evaluate(deck[8:13]) == 7462
+        assert self.table.evaluate(deck[0:52:13] + deck[1:3]) == 7298
+
+    def test_random_hands(self):
+        rng = random.Random(0)
+        for n in range(20000):
+            cards = rng.sample(INTS, rng.choice((5, 6, 7)))
+            assert (self.table.evaluate(cards) ==
+                    self.lookup.evaluate_best(cards)), cards
+
+    def test_save_load(self, tmp_path):
+        path = str(tmp_path / 'states.bin')
+        self.table.save(path)
+        table = StateTable.load(path)
+        assert table.path == path
+        assert len(table) == len(self.table)
+        assert list(table.table) == list(self.table.table)
+        assert list(table.flushes) == list(self.table.flushes)
+
+    def test_load_exception(self, tmp_path):
+        path = tmp_path / 'states.bin'
+        path.write_bytes(b'PKST' + bytes(60))
+        with pytest.raises(ValueError):
+            StateTable.load(str(path))
+        # Shorter than the header.
+        path.write_bytes(b'PKST')
+        with pytest.raises(ValueError):
+            StateTable.load(str(path))
+
+    def test_evaluate_exception(self):
+        with pytest.raises(ValueError):
+            self.table.evaluate(INTS[0:9])
+        with pytest.raises(ValueError):
+            self.table.evaluate(INTS[0:4])
+
+    def test_default_table(self):
+        assert default_table() is default_table()
+        assert default_table().evaluate(INTS[6:13]) == 7462
+
+
+class TestDeckTables:
+
+    def test_short_deck(self):
+        deck = get_deck('shortdeck')
+        table = StateTable.generate(deck)
+        assert len(table) < 76155
+        assert table.deck == deck
+        rng = random.Random(3)
+        lookup = deck_table(deck)
+        for n in range(5000):
+            cards = rng.sample(deck.ints, rng.choice((5, 6, 7)))
+            assert table.evaluate(cards) == lookup.evaluate_best(cards), cards
+
+    def test_paths(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('PYPOKER_CACHE', str(tmp_path))
+        paths = {default_path(deck) for deck in
+                 (None, 'shortdeck', DeckDefinition('x', '6789TJQKA', False))}
+        assert len(paths) == 3
+        assert default_path() == str(tmp_path / 'states-v1.bin')
+
+    def test_default_table(self):
+        assert default_table('shortdeck') is default_table(
+            get_deck('shortdeck'))
+        assert default_table('shortdeck').deck.name == 'shortdeck'
+
+
+class TestStateEngine:
+
+    def test_hand_value(self):
+        deck = CardsDeck()
+        rng = random.Random(1)
+        for n in range(500):
+            hand = Hand(rng.sample(deck[:], 7))
+            assert (Evaluator(hand, 'state').hand_value() ==
+                    Evaluator(hand, 'lookup').hand_value())
+
+
+class TestBoardState:
+
+    def setup_method(self):
+        self.rng = random.Random(2)
+
+    def test_streets(self):
+        cards = self.rng.sample(INTS, 7)
+        hole, board_cards = cards[:2], cards[2:]
+        board = BoardState()
+        assert board.street == 'preflop'
+        for size, street in ((3, 'flop'), (4, 'turn'), (5, 'river')):
+            while len(board) < size:
+                board.add(board_cards[len(board)])
+            assert board.street == street
+            assert board.evaluate(hole) == \
+                default_table().evaluate(hole + board_cards[:size])
+            assert board.category(hole) == lookup_table().category(
+                board.evaluate(hole))
+
+    def test_random_boards(self):
+        for n in range(2000):
+            cards = self.rng.sample(INTS, 5 + 2 * 3)
+            board = BoardState(cards[:5])
+            for seat in range(3):
+                hole = cards[5 + 2 * seat:7 + 2 * seat]
+                assert board.evaluate(hole) == \
+                    default_table().evaluate(hole + cards[:5])
+
+    def test_copy(self):
+        deck = CardsDeck()
+        flop = BoardState(deck[0:3])
+        turn = flop.copy()
+        turn.add(deck[3])
+        assert len(flop) == 3
+        assert turn.street == 'turn'
+        assert turn.evaluate(deck[4:6]) == default_table().evaluate(
+            [encode(card) for card in deck[0:6]])
+
+    def test_category_before_five_cards(self):
+        board = BoardState()
+        assert board.category([Card('A', 'spades'), Card('A', 'hearts')]) == 100
+        assert board.category([Card('A', 'spades'), Card('K', 'hearts')]) == 0
+        board.add(Card('A', 'clubs'))
+        board.add(Card('K', 'clubs'))
+        assert board.street is None
+        assert board.category([Card('A', 'spades'), Card('K', 'hearts')]) == 200
+        assert board.category([Card('A', 'spades'), Card('A', 'hearts')]) == 300
+        board.add(Card('A', 'diamonds'))
+        assert board.category([Card('A', 'spades'), Card('A', 'hearts')]) == 700
+
+    def test_exceptions(self):
+        deck = CardsDeck(encoded=True)
+        board = BoardState(deck[0:5])
+        with pytest.raises(ValueError):
+            board.add(deck[5])
+        with pytest.raises(ValueError):
+            board.evaluate(deck[5:8])
+        with pytest.raises(ValueError):
+            BoardState([deck[0], deck[0]])
+        with pytest.raises(ValueError):
+            BoardState(deck[0:2]).evaluate(deck[2:4])
@@ -0,0 +1,135 @@
+from itertools import combinations
+import random
+
+import pytest
+
+from pypoker.cards import *
+from pypoker.lookup import LookupTable, default_table, straights
+from pypoker.poker import PokerPlayer, PokerTable
+from pypoker.rng import SeededRNG
+from pypoker.statetable import default_table as state_table
+from pypoker.variants import VARIANTS, Variant, get_variant
+
+
+def cards(text):
+    return [INTS['sdch'.index(card[1]) * 13 + RANKS.index(card[0])]
+            for card in text.split()]
+
+
+def omaha_brute_force(hole, board):
+    table = default_table()
+    return max(table.evaluate(list(two) + list(three))
+               for two in combinations(hole, 2)
+               for three in combinations(board, 3))
+
+
+class TestVariants:
+
+    def setup_method(self):
+        self.rng = random.Random(4)
+
+    @pytest.mark.parametrize('name, hole_cards', [
+        ('omaha', 4), ('omaha5', 5), ('omaha6', 6)])
+    def test_omaha(self, name, hole_cards):
+        variant = get_variant(name)
+        for n in range(200):
+            dealt = self.rng.sample(INTS, 5 + 2 * hole_cards)
+            board = dealt[:5]
+            holes = [dealt[5:5 + hole_cards], dealt[5 + hole_cards:]]
+            assert variant.showdown(holes, board) == [
+                omaha_brute_force(hole, board) for hole in holes]
+
+    def test_omaha_rules(self):
+        omaha = get_variant('omaha')
+        # Four spades in hand and one on the board make no flush.
+        strength = omaha.evaluate(cards('As Ks Qs Js'), cards('2s 7d 8c 9h 3d'))
+        assert omaha.category(strength) == 0
+        # Nor does a board of quads give quads.
+        strength = omaha.evaluate(cards('2h 3d 4s 6h'), cards('9s 9d 9c 9h Kd'))
+        assert omaha.category(strength) == 300
+        with pytest.raises(ValueError):
+            omaha.evaluate(cards('As Ks Qs Js'), cards('2s 7d'))
+        with pytest.raises(ValueError):
+            omaha.evaluate(cards('As'), cards('2s 7d 8c 9h 3d'))
+        with pytest.raises(ValueError):
+            omaha.showdown([cards('As Ks'), cards('Ah Kh Qh Jh Th 9h 8h')],
+                           cards('2s 7d 8c 9h 3d'))
+
+    def test_holdem(self):
+        holdem = get_variant('holdem')
+        for n in range(200):
+            dealt = self.rng.sample(INTS, 7)
+            assert holdem.evaluate(dealt[:2], dealt[2:]) == \
+                state_table().evaluate(dealt)
+        assert holdem.standard
+
+    def test_short_deck(self):
+        short = get_variant('shortdeck')
+        assert not short.standard
+        assert len(short.deck) == 36
+        low = short.evaluate(cards('As 6d'), cards('7c 8h 9s Kd Kc'))
+        six = short.evaluate(cards('Ts 6d'), cards('7c 8h 9s Kd Kc'))
+        assert short.category(low) == 400
+        assert six > low
+        assert short.table.hand_value(low).ranks == [9, 8, 7, 6, 5]
+        flush = short.evaluate(cards('As 6s'), cards('7s 8s Ts Kd Kc'))
+        full_house = short.evaluate(cards('Ks Kh'), cards('7s 8s Ts Kd Tc'))
+        assert short.category(flush) == 500
+        assert short.category(full_house) == 600
+        assert flush > full_house
+
+    def test_get_variant(self):
+        variant = Variant('custom', 3, deck='piquet')
+        assert get_variant(variant) is variant
+        assert variant.deck.ranks == '789TJQKA'
+        assert get_variant('omaha').hole_cards == 4
+        with pytest.raises(ValueError):
+            get_variant('stud')
+
+
+class TestRules:
+
+    def test_straights(self):
+        assert len(straights(range(13))) == 10
+        assert straights(range(4, 13))[-1] == 0b1000011110000
+        assert straights(range(8)) == [0b11111000, 0b1111100, 0b111110,
+                                       0b11111]
+
+    def test_flush_beats_full_house(self):
+        table = LookupTable(straights(range(4, 13)), True)
+        assert table.categories[5:7] == (600, 500)
+        assert table.category(table.bounds[6]) == 500
+        assert table.category(table.bounds[6] - 1) == 600
+        assert default_table(straights(range(4, 13)), True) is \
+            default_table(straights(range(4, 13)), True)
+
+
+class TestVariantTable:
+
+    def new_table(self, variant):
+        table = PokerTable(rng=SeededRNG(1), variant=variant)
+        for n in range(4):
+            table.sit_player(PokerPlayer(str(n)))
+        table.start_game()
+        table.deal_cards()
+        return table
+
+    def test_omaha_table(self):
+        table = self.new_table('omaha')
+        assert all(len(player.cards) == 4 for player in table.players)
+        board = [encode(card) for card in table.cards]
+        strengths = [omaha_brute_force([encode(card) for card in player.cards],
+                                       board) for player in table.players]
+        winners = [player for player, strength in
+                   zip(table.players, strengths) if strength == max(strengths)]
+        assert table.showdown().winners == winners
+        with pytest.raises(ValueError):
+            table.equity(trials=10)
+
+    def test_short_deck_table(self):
+        table = self.new_table('shortdeck')
+        dealt = table.cards + [card for player in table.players
+                               for card in player.cards]
+        assert len(set(dealt)) == 13
+        assert all(card.rank in '6789TJQKA' for card in dealt)
+        assert len(table.showdown().ordering[0]) >= 1